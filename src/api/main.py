@@ -1,10 +1,40 @@
 # src/api/main.py
 
-from fastapi import FastAPI
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, HTTPException, Header, BackgroundTasks
+from fastapi.responses import PlainTextResponse, JSONResponse
 from pydantic import BaseModel
 from src.llm.pipeline import generate_response
+from src.metrics import stage, collect_stage_timings, format_server_timing, render_metrics
+from src.api.profiling import should_profile, profile_request, write_profile
+from src.llm.warmup import WarmupManager
+from src.rag.reloader import PolicyReloader
+from src.audit import AuditLog, collect_audit_fields
+from src import config
 
-app = FastAPI(title="RAG Knowledge Assistant")
+warmup = WarmupManager()
+reloader = PolicyReloader()
+audit_log = AuditLog()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background warm-up, policy watching and the audit writer when the server starts,
+    and stop them on shutdown. Queued audit records are written before the server exits.
+    """
+    if config.WARMUP_ENABLED:
+        warmup.start()
+    if reloader.interval > 0:
+        reloader.start()
+    if config.AUDIT_ENABLED:
+        audit_log.start()
+    yield
+    warmup.stop()
+    reloader.stop()
+    audit_log.stop()
+
+app = FastAPI(title="RAG Knowledge Assistant", lifespan=lifespan)
 
 # Request body model
 class TicketRequest(BaseModel):
@@ -16,41 +46,100 @@ class TicketResponse(BaseModel):
     references: list[str]
     action_required: str
 
+def audit_ticket(request_id: str, ticket: str, result: dict, fields: dict = None, timings: dict = None):
+    """
+    Queue the audit record of a resolved ticket; never waits on disk.
+    """
+    if not config.AUDIT_ENABLED:
+        return
+    audit_log.record({
+        "request_id": request_id,
+        "ticket": ticket,
+        "sections": [],
+        **(fields or {}),
+        "response": result,
+        "timings": timings or {},
+    })
+
 @app.post("/resolve-ticket", response_model=TicketResponse)
-def resolve_ticket(request: TicketRequest):
+def resolve_ticket(
+    request: TicketRequest,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    x_request_id: str | None = Header(default=None),
+    x_profile: str | None = Header(default=None),
+):
     """
     Endpoint to handle user queries and return structured responses.
+    Per-stage durations are reported in the Server-Timing header.
+    When profiling is enabled, requests with "X-Profile: 1" or sampled requests are profiled.
 
     Args:
         request (TicketRequest): The incoming request containing the user ticket.
+        response (Response): Outgoing response, used to set headers.
+        background_tasks (BackgroundTasks): Work run after the response is sent, e.g. writing profiles.
+        x_request_id (str): Optional request ID; generated when missing and echoed back.
+        x_profile (str): Set to "1" to request a profile of this request.
     Returns:
         TicketResponse: The structured response from the LLM.
     """
+    request_id = x_request_id or uuid.uuid4().hex
+    response.headers["X-Request-ID"] = request_id
+
     if not request.ticket_text or not request.ticket_text.strip():
-        return TicketResponse(
-            answer="Error: Empty ticket provided.",
-            references=[],
-            action_required="none"
-        )
-    try:
-        response = generate_response(request.ticket_text, top_k=1)
-    except Exception as e:
-        response = {
-            "answer": f"Error processing the ticket: {e}",
-            "references": [],
-            "action_required": "none"
-        }
+        result = {"answer": "Error: Empty ticket provided.", "references": [], "action_required": "none"}
+        audit_ticket(request_id, request.ticket_text, result)
+        return TicketResponse(**result)
+
+    with collect_stage_timings() as timings, collect_audit_fields() as audit_fields:
+        with profile_request(should_profile(x_profile == "1")) as profiler:
+            with stage("total"):
+                try:
+                    result = generate_response(request.ticket_text, top_k=1)
+                except Exception as e:
+                    result = {
+                        "answer": f"Error processing the ticket: {e}",
+                        "references": [],
+                        "action_required": "none"
+                    }
+    response.headers["Server-Timing"] = format_server_timing(timings)
+    if profiler is not None:
+        # Written after the response is sent so disk I/O does not add to the request's latency
+        background_tasks.add_task(write_profile, profiler, request_id, timings)
 
-    if not all(k in response for k in ("answer", "references", "action_required")):
-        response = {
+    if not all(k in result for k in ("answer", "references", "action_required")):
+        result = {
             "answer": "Error: Incomplete response from LLM.",
             "references": [],
             "action_required": "none"
         }
-    
-    return response
+
+    audit_ticket(request_id, request.ticket_text, result, audit_fields, timings)
+    return result
 
 # Health check endpoint
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+# Readiness endpoint for load balancers: 200 only once models are warm
+@app.get("/ready")
+def readiness_check():
+    if config.WARMUP_ENABLED and not warmup.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "components": warmup.status})
+    return {"status": "ready", "components": warmup.status}
+
+# Admin endpoint to rebuild the policy index in the background and swap it in without downtime
+@app.post("/admin/reload-policies", status_code=202)
+def reload_policies(x_admin_token: str | None = Header(default=None)):
+    if config.ADMIN_TOKEN and x_admin_token != config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+    reloader.request_reload()
+    return {"status": "reload_scheduled", "reload": reloader.status}
+
+# Prometheus metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
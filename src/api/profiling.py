@@ -0,0 +1,166 @@
+# src/api/profiling.py
+
+# Opt-in per-request profiling for the API
+# Profiles selected /resolve-ticket requests and writes them to PROFILING_DIR,
+# labelled with the request ID and the request's stage timings
+
+import cProfile
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from src import config
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Only one request is profiled at a time; others run unprofiled rather than wait.
+# This bounds overhead under load and avoids competing profilers on the same interpreter.
+_profile_lock = threading.Lock()
+
+
+def should_profile(requested: bool = False):
+    """
+    Decide whether the current request is profiled.
+
+    Args:
+        requested (bool): Whether the client asked for a profile (X-Profile header).
+    Returns:
+        bool: True if profiling is enabled and the request was requested or sampled.
+    """
+    if not config.PROFILING_ENABLED:
+        return False
+    return requested or random.random() < config.PROFILING_SAMPLE_RATE
+
+
+class SamplingProfiler:
+    """
+    Stack sampler for a single thread.
+    A background thread records the target thread's call stack at a fixed interval;
+    the result is a count per collapsed stack, the input format of flame graph tools.
+
+    Attributes:
+        thread_id (int): Identifier of the sampled thread.
+        interval (float): Seconds between samples.
+        samples (collections.Counter): Collapsed stack ("outer;...;inner") to sample count.
+    """
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_request(enabled: bool):
+    """
+    Profile the enclosed block on the current thread.
+
+    Args:
+        enabled (bool): Whether to profile (see should_profile).
+    Yields:
+        cProfile.Profile | SamplingProfiler | None: The profiler, or None if the block
+        is not profiled because profiling is off or another request is being profiled.
+    """
+    if not enabled or not _profile_lock.acquire(blocking=False):
+        yield None
+        return
+
+    try:
+        if config.PROFILING_MODE == "deterministic":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield profiler
+            finally:
+                profiler.disable()
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), config.PROFILING_INTERVAL_MS / 1000)
+            profiler.start()
+            try:
+                yield profiler
+            finally:
+                profiler.stop()
+    finally:
+        _profile_lock.release()
+
+
+def _safe_name(request_id: str):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", request_id)[:64] or "request"
+
+
+def write_profile(profiler, request_id: str, timings: dict):
+    """
+    Write a profile and its metadata to PROFILING_DIR.
+    The API runs this as a background task after the response is sent, so the disk writes
+    are not part of the profiled request's latency.
+
+    Files are named <timestamp>_<request_id>_<random suffix>, so profiles of requests sharing
+    an ID never overwrite each other; the profile is ".prof" (cProfile, readable with pstats
+    or snakeviz) or ".folded" (collapsed stacks for flame graphs), and ".json" holds the request ID
+    and stage timings in milliseconds.
+
+    Args:
+        profiler (cProfile.Profile | SamplingProfiler): The finished profiler.
+        request_id (str): Request identifier.
+        timings (dict[str, float]): Stage name to seconds.
+    Returns:
+        Path | None: Path of the profile file, or None if writing failed.
+    """
+    try:
+        directory = Path(config.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%dT%H%M%S')}_{_safe_name(request_id)}_{uuid.uuid4().hex[:8]}"
+
+        if isinstance(profiler, SamplingProfiler):
+            profile_path = directory / f"{stem}.folded"
+            profiler.dump(str(profile_path))
+        else:
+            profile_path = directory / f"{stem}.prof"
+            profiler.dump_stats(str(profile_path))
+
+        metadata = {
+            "request_id": request_id,
+            "profile": profile_path.name,
+            "mode": "sampling" if isinstance(profiler, SamplingProfiler) else "deterministic",
+            "stage_timings_ms": {name: round(seconds * 1000, 3) for name, seconds in timings.items()},
+        }
+        with open(directory / f"{stem}.json", "w") as f:
+            json.dump(metadata, f, indent=2)
+        return profile_path
+    except Exception as e:
+        logger.error(f"Error writing profile for request {request_id}: {e}")
+        return None
@@ -0,0 +1,304 @@
+# src/audit.py
+
+# Audit log for the RAG system
+# Records every resolved ticket with its retrieved sections and LLM output for compliance and
+# offline evaluation. The request path only enqueues records; a background thread writes them
+# in batches to SQLite (WAL mode) or size-rotated JSONL files.
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from src import config
+from src.metrics import AUDIT_RECORDS
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_audit_fields = contextvars.ContextVar("audit_fields", default=None)
+
+
+@contextmanager
+def collect_audit_fields():
+    """
+    Collect audit fields noted by the pipeline in the current context.
+
+    Yields:
+        dict: Fields filled in by note() while the block runs.
+    """
+    fields = {}
+    token = _audit_fields.set(fields)
+    try:
+        yield fields
+    finally:
+        _audit_fields.reset(token)
+
+
+def note(**fields):
+    """
+    Add fields to the audit record of the current request, if one is being collected.
+    """
+    current = _audit_fields.get()
+    if current is not None:
+        current.update(fields)
+
+
+class SQLiteWriter:
+    """
+    Appends audit records to an SQLite database in WAL mode, one transaction per batch.
+    """
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last transactions on power loss, never corruption
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS audit_log ("
+            "id INTEGER PRIMARY KEY, timestamp REAL, request_id TEXT, record TEXT)"
+        )
+        self.connection.commit()
+
+    def write(self, records: list):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO audit_log (timestamp, request_id, record) VALUES (?, ?, ?)",
+                [(r.get("timestamp"), r.get("request_id"), json.dumps(r, default=str)) for r in records],
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+class JSONLWriter:
+    """
+    Appends audit records to a JSONL file, rotating it to path.1 ... path.<backup_count>
+    once it reaches max_bytes.
+    """
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024, backup_count: int = 10):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, records: list):
+        self.file.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+        self.file.flush()
+        if self.max_bytes and self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        self.file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{i}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        self.file.close()
+
+
+def open_writer(backend: str, path: str):
+    if backend == "sqlite":
+        return SQLiteWriter(path)
+    if backend == "jsonl":
+        return JSONLWriter(path, config.AUDIT_MAX_BYTES, config.AUDIT_BACKUP_COUNT)
+    raise ValueError(f"Unknown audit backend: {backend}")
+
+
+class AuditLog:
+    """
+    Bounded in-memory queue of audit records drained by a background writer.
+    The writer takes everything queued (up to batch_size) per write, so batches grow with load.
+
+    record() never waits on disk. When the queue is full, the "drop" policy discards the
+    record immediately; the "block" policy waits up to block_timeout for space and then drops.
+    After stop(), the log is closed and further records are dropped rather than starting a
+    writer that would not be flushed. Dropped records are counted in
+    rag_audit_records_total{result="dropped"}.
+
+    max_queue bounds the number of queued records, not their size: records carrying long
+    LLM outputs can make the queue use far more memory than max_queue suggests.
+
+    Attributes:
+        backend (str): "sqlite" or "jsonl".
+        path (str): Database or JSONL file path.
+        written (int): Records written so far.
+        dropped (int): Records discarded because the queue was full or the log was closed.
+    """
+    def __init__(self, backend: str = None, path: str = None, max_queue: int = None, batch_size: int = None,
+                 overflow: str = None, block_timeout: float = None):
+        self.backend = backend or config.AUDIT_BACKEND
+        self.path = path or config.AUDIT_PATH
+        self.batch_size = batch_size or config.AUDIT_BATCH_SIZE
+        self.overflow = overflow or config.AUDIT_OVERFLOW
+        self.block_timeout = config.AUDIT_BLOCK_TIMEOUT if block_timeout is None else block_timeout
+        if self.overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown audit overflow policy: {self.overflow}")
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue or config.AUDIT_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._start_lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+
+    def start(self):
+        """
+        Open the log (again, after stop()) and start the writer.
+        """
+        with self._start_lock:
+            self._closed = False
+        self._start_writer()
+
+    def _start_writer(self):
+        with self._start_lock:
+            if self._thread is None and not self._closed:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Write every queued record, stop the writer and close the log to new records.
+        """
+        with self._start_lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            try:
+                # Wake the writer if it is waiting on an empty queue
+                self._queue.put_nowait(threading.Event())
+            except queue.Full:
+                pass
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Audit writer did not finish within {timeout}s; {self._queue.qsize()} records pending")
+                return
+        # Records that raced with shutdown are counted rather than silently lost
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(item, threading.Event):
+                self._drop()
+
+    def record(self, entry: dict):
+        """
+        Queue a record without waiting for it to be written.
+
+        Args:
+            entry (dict): JSON-serializable record; a timestamp is added if missing.
+        Returns:
+            bool: False if the record was dropped because the queue was full or the log is closed.
+        """
+        if self._closed:
+            return self._drop()
+        entry.setdefault("timestamp", time.time())
+        if self._thread is None:
+            self._start_writer()
+        try:
+            if self.overflow == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            return self._drop()
+
+    def _drop(self):
+        with self._dropped_lock:
+            self.dropped += 1
+        AUDIT_RECORDS.inc(result="dropped")
+        return False
+
+    def flush(self, timeout: float = 10.0):
+        """
+        Wait until every record queued so far has been written.
+
+        Returns:
+            bool: True if the queue drained within timeout.
+        """
+        if self._closed:
+            return self._queue.empty()
+        done = threading.Event()
+        if self._thread is None:
+            self._start_writer()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _next_batch(self):
+        """
+        Block for the first record, then take whatever else is queued, up to batch_size.
+        Flush markers are returned separately so they are set after the batch is written.
+        """
+        batch, markers = [], []
+        item = self._queue.get()
+        while True:
+            (markers if isinstance(item, threading.Event) else batch).append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return batch, markers
+
+    def _write(self, writer, batch: list):
+        try:
+            writer.write(batch)
+            self.written += len(batch)
+            AUDIT_RECORDS.inc(len(batch), result="written")
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit records: {e}")
+            AUDIT_RECORDS.inc(len(batch), result="failed")
+
+    def _run(self):
+        try:
+            writer = open_writer(self.backend, self.path)
+        except Exception as e:
+            logger.error(f"Cannot open audit log {self.path}: {e}")
+            writer = None
+        try:
+            while True:
+                batch, markers = self._next_batch()
+                if batch:
+                    if writer is not None:
+                        self._write(writer, batch)
+                    else:
+                        AUDIT_RECORDS.inc(len(batch), result="failed")
+                for marker in markers:
+                    marker.set()
+                # Records queued before stop() are still in the queue or already written
+                if self._stop.is_set() and self._queue.empty():
+                    break
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+# Test usage
+if __name__ == "__main__":
+    audit_log = AuditLog(backend="jsonl", path="./data/audit/example.jsonl")
+    audit_log.record({"request_id": "example", "ticket": "Where is my refund?", "response": {"answer": "..."}})
+    audit_log.stop()
+    print(f"Wrote {audit_log.written} records to {audit_log.path}")
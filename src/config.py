@@ -0,0 +1,110 @@
+# src/config.py
+
+# Runtime configuration for the RAG system
+# Values are read from environment variables so deployments can tune them without code changes
+
+import os
+
+
+def _env_float(name: str, default: float):
+    """
+    Read a float from the environment, falling back to the default on missing or bad values.
+    """
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool):
+    """
+    Read a boolean flag from the environment ("1", "true", "yes" and "on" are true).
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Action fast path: path to a trained classifier (see src/llm/classifier.py).
+# Leave empty to disable the fast path and always call the LLM.
+ACTION_CLASSIFIER_PATH = os.getenv("ACTION_CLASSIFIER_PATH", "")
+
+# Overrides the calibrated confidence threshold stored with the classifier when set (0 < t <= 1)
+ACTION_CLASSIFIER_THRESHOLD = _env_float("ACTION_CLASSIFIER_THRESHOLD", 0.0)
+
+# Record Prometheus metrics and expose them at /metrics.
+# When disabled, metric updates return immediately and /metrics responds with 404.
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+
+# Per-request profiling of /resolve-ticket (see src/api/profiling.py).
+# Nothing is profiled unless enabled; then requests carrying "X-Profile: 1" are always
+# profiled and other requests are sampled at PROFILING_SAMPLE_RATE (0.0 to 1.0).
+PROFILING_ENABLED = _env_bool("PROFILING_ENABLED", False)
+PROFILING_SAMPLE_RATE = _env_float("PROFILING_SAMPLE_RATE", 0.0)
+PROFILING_DIR = os.getenv("PROFILING_DIR", "./profiles")
+# "sampling" records stack samples every PROFILING_INTERVAL_MS (low overhead, collapsed-stack output);
+# "deterministic" uses cProfile (exact call counts, higher overhead, .prof output)
+PROFILING_MODE = os.getenv("PROFILING_MODE", "sampling")
+PROFILING_INTERVAL_MS = _env_float("PROFILING_INTERVAL_MS", 5.0)
+
+# LLM backend: "ollama" runs the local model; "fake" returns simulated responses
+# (see src/llm/fake_llm.py) for load testing without an LLM.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "ollama")
+# Simulated generation time of the fake backend, e.g. "0.5", "uniform:0.2,0.8" or "lognormal:0.5,0.4"
+FAKE_LLM_LATENCY = os.getenv("FAKE_LLM_LATENCY", "0")
+# Fraction of fake LLM calls that fail with no output
+FAKE_LLM_FAILURE_RATE = _env_float("FAKE_LLM_FAILURE_RATE", 0.0)
+
+# Directory for precomputed document embeddings (see FAISSIndex). When set, workers reuse
+# embeddings computed by an earlier build instead of re-encoding every policy section at startup.
+# Precompute with: INDEX_CACHE_DIR=data/index_cache python -m src.index.faiss_index
+INDEX_CACHE_DIR = os.getenv("INDEX_CACHE_DIR", "")
+
+# Warm-up at API startup (see src/llm/warmup.py): load the embedding model and index, preload the
+# Ollama model, and refresh its keep-alive while idle. /ready reports 503 until warm.
+WARMUP_ENABLED = _env_bool("WARMUP_ENABLED", True)
+# Ollama server used to preload the model; accepts "host:port" like Ollama's own OLLAMA_HOST
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+# How long Ollama keeps the model loaded after a request (Ollama duration, e.g. "30m", or "-1" for forever)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Seconds without LLM traffic after which the keep-alive is refreshed; keep it below OLLAMA_KEEP_ALIVE
+KEEP_ALIVE_INTERVAL = _env_float("KEEP_ALIVE_INTERVAL", 300.0)
+
+# Directory of policy JSON files indexed by the retriever
+POLICY_DIR = os.getenv("POLICY_DIR", "./data/raw_docs")
+# Seconds between checks of POLICY_DIR for changes; changed policies are re-indexed in the
+# background and swapped in without downtime (see src/rag/reloader.py). 0 disables watching.
+POLICY_RELOAD_INTERVAL = _env_float("POLICY_RELOAD_INTERVAL", 0.0)
+# Token required in the X-Admin-Token header by admin endpoints; empty leaves them open
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Vector storage of the policy index: "flat" (float32), "fp16", "sq8" (8-bit) or "pq" (product quantization)
+INDEX_COMPRESSION = os.getenv("INDEX_COMPRESSION", "flat")
+# Re-rank top_k * factor compressed candidates against full-precision vectors (0 or 1 disables)
+INDEX_RERANK_FACTOR = int(_env_float("INDEX_RERANK_FACTOR", 0))
+# Number of PQ subquantizers (bytes per vector); 0 picks one per 8 dimensions
+INDEX_PQ_M = int(_env_float("INDEX_PQ_M", 0))
+
+# Collapse exact and near-duplicate policy sections into one indexed section
+INDEX_DEDUP = _env_bool("INDEX_DEDUP", False)
+# Minimum estimated Jaccard similarity of word shingles for two sections to be near duplicates
+INDEX_DEDUP_THRESHOLD = _env_float("INDEX_DEDUP_THRESHOLD", 0.8)
+# Minimum cosine similarity of their embeddings, confirming a near duplicate
+INDEX_DEDUP_EMBEDDING_THRESHOLD = _env_float("INDEX_DEDUP_EMBEDDING_THRESHOLD", 0.95)
+
+# Audit log of resolved tickets, written in the background
+AUDIT_ENABLED = _env_bool("AUDIT_ENABLED", False)
+# "sqlite" (WAL mode) or "jsonl" (size-rotated files)
+AUDIT_BACKEND = os.getenv("AUDIT_BACKEND", "sqlite")
+AUDIT_PATH = os.getenv("AUDIT_PATH", "./data/audit/audit.db")
+# Records held in memory while the writer catches up; beyond this the overflow policy applies
+AUDIT_QUEUE_SIZE = int(_env_float("AUDIT_QUEUE_SIZE", 10000))
+# Most records written per transaction or file append
+AUDIT_BATCH_SIZE = int(_env_float("AUDIT_BATCH_SIZE", 256))
+# When the queue is full: "drop" the record, or "block" the request for up to AUDIT_BLOCK_TIMEOUT seconds first
+AUDIT_OVERFLOW = os.getenv("AUDIT_OVERFLOW", "drop")
+AUDIT_BLOCK_TIMEOUT = _env_float("AUDIT_BLOCK_TIMEOUT", 0.05)
+# JSONL files rotate at this size, keeping AUDIT_BACKUP_COUNT old files
+AUDIT_MAX_BYTES = int(_env_float("AUDIT_MAX_BYTES", 100 * 1024 * 1024))
+AUDIT_BACKUP_COUNT = int(_env_float("AUDIT_BACKUP_COUNT", 10))
@@ -4,15 +4,23 @@
 # Implements vector-based document retrieval using FAISS
 # Uses sample documents for demonstration
 
-import faiss
+# faiss and sentence_transformers (which pulls in torch) are imported where they are used,
+# so importing this module stays cheap until an index is actually built
+
 from src.ingest.loader import load_policies
-from sentence_transformers import SentenceTransformer
+from src.ingest.dedup import deduplicate_sections
+from pathlib import Path
 import numpy as np
+import hashlib
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Vector storage options: float32 (flat), float16, 8-bit scalar quantization, product quantization
+COMPRESSIONS = ("flat", "fp16", "sq8", "pq")
+
 class FAISSIndex:
     """
     FAISS Index for document retrieval.
@@ -22,8 +30,30 @@ class FAISSIndex:
         index (faiss.Index): The FAISS index for document retrieval.
         section_map (dict): Mapping of FAISS indices to document sections.
         model (SentenceTransformer): The sentence transformer model for embeddings.
+
+    A preloaded model (or any object with a compatible encode method) can be passed
+    as model to skip loading model_name. When cache_dir is set, document embeddings are
+    stored there keyed by model name and section texts, and reused on later builds.
+
+    compression selects how vectors are stored: "flat" (float32, exact), "fp16" (2x smaller),
+    "sq8" (8-bit scalar quantization, 4x smaller) or "pq" (product quantization with pq_m
+    subquantizers, typically 32x smaller). With rerank_factor > 1, compressed searches fetch
+    top_k * rerank_factor candidates and re-rank them by exact distance to the full-precision
+    vectors, which are memory-mapped from the embedding cache on disk when cache_dir is set.
+
+    With dedup, exact and near-duplicate sections are collapsed before indexing (see
+    src/ingest/dedup.py); each indexed section lists the sections it replaces under "sources".
     """
-    def __init__(self, policy_dir="./data/raw_docs", model_name='all-MiniLM-L6-v2'):
+    def __init__(self, policy_dir="./data/raw_docs", model_name='all-MiniLM-L6-v2', model=None, cache_dir=None,
+                 compression="flat", rerank_factor=0, pq_m=0,
+                 dedup=False, dedup_threshold=0.8, dedup_embedding_threshold=0.95):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}")
+        self.compression = compression
+        self.rerank_factor = rerank_factor
+        # Rows of the embedding cache behind each indexed vector, when deduplication dropped some
+        self.vector_ids = None
+
         # Load policy documents
         self.sections = load_policies(policy_dir)
         if not self.sections:
@@ -33,10 +63,24 @@ class FAISSIndex:
             self.model = None
             return
         
-        self.model = self.__load_model(model_name)
-        self.embeddings = self.__create_embeddings([section["text"] for section in self.sections])
-        self.index = self.__build_faiss_index(self.embeddings)
+        self.model = model if model is not None else self.__load_model(model_name)
+        texts = [section["text"] for section in self.sections]
+        cache_path = self.__cache_path(cache_dir, model_name, texts) if cache_dir else None
+        self.embeddings = self.__load_cached_embeddings(cache_path, len(texts)) if cache_path else None
+        if self.embeddings is None:
+            self.embeddings = self.__create_embeddings(texts)
+            if cache_path and self.embeddings.size:
+                self.__save_cached_embeddings(cache_path, self.embeddings)
+        if dedup and self.embeddings.size:
+            self.sections, keep = deduplicate_sections(
+                self.sections, self.embeddings, dedup_threshold, dedup_embedding_threshold)
+            if len(keep) < len(texts):
+                self.vector_ids = np.asarray(keep, dtype='int64')
+                self.embeddings = self.embeddings[self.vector_ids]
+        self.index = self.__build_faiss_index(self.embeddings, compression, pq_m)
         self.section_map = {i: self.sections[i] for i in range(len(self.sections))}
+        if compression != "flat":
+            self.embeddings = self.__full_precision_vectors(cache_path)
 
     def __load_model(self, model_name):
         """
@@ -48,6 +92,7 @@ class FAISSIndex:
             SentenceTransformer: The loaded model.
         """
         try:
+            from sentence_transformers import SentenceTransformer
             return SentenceTransformer(model_name)
         except Exception as e:
             logger.error(f"Error loading model {model_name}: {e}")
@@ -70,23 +115,137 @@ class FAISSIndex:
             logger.error(f"Error creating embeddings: {e}")
             return np.array([], dtype='float32')
         
-    def __build_faiss_index(self, embeddings):
+    def __cache_path(self, cache_dir, model_name, texts):
+        """
+        Path of the cached embeddings for the given model and texts.
+        """
+        digest = hashlib.sha256(model_name.encode())
+        for text in texts:
+            digest.update(b"\0" + text.encode())
+        return Path(cache_dir) / f"embeddings-{digest.hexdigest()[:24]}.npy"
+
+    def __load_cached_embeddings(self, cache_path, n_texts):
+        """
+        Load precomputed embeddings, or return None if they are missing or unusable.
+        """
+        if not cache_path.exists():
+            return None
+        try:
+            embeddings = np.load(cache_path).astype('float32', copy=False)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable embedding cache {cache_path}: {e}")
+            return None
+        if embeddings.ndim != 2 or embeddings.shape[0] != n_texts:
+            logger.warning(f"Ignoring embedding cache {cache_path} with unexpected shape {embeddings.shape}")
+            return None
+        logger.info(f"Loaded {n_texts} precomputed embeddings from {cache_path}")
+        return embeddings
+
+    def __save_cached_embeddings(self, cache_path, embeddings):
+        """
+        Write embeddings to the cache atomically so concurrent workers never read a partial file.
+        """
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, embeddings)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to write embedding cache {cache_path}: {e}")
+
+    def __build_faiss_index(self, embeddings, compression="flat", pq_m=0):
         """
         Build the FAISS index from embeddings.
 
         Args:
             embeddings (np.ndarray): Array of document embeddings.
+            compression (str): Vector storage, one of COMPRESSIONS.
+            pq_m (int): Number of PQ subquantizers; 0 picks one byte per 8 dimensions.
         Returns:
             faiss.Index: The built FAISS index.
         """
         if embeddings.size == 0:
             logger.warning("Empty embeddings array. FAISS index will not be created.")
             return None
-        dimension = embeddings.shape[1]
-        index = faiss.IndexFlatL2(dimension)
+        import faiss
+
+        n_vectors, dimension = embeddings.shape
+        if compression == "pq":
+            # k-means needs at least 2**nbits training vectors per subquantizer
+            nbits = min(8, int(np.log2(n_vectors)))
+            if nbits < 4:
+                logger.warning(f"Too few vectors ({n_vectors}) to train product quantization, using sq8 instead.")
+                compression = "sq8"
+            else:
+                index = faiss.IndexPQ(dimension, self.__pq_subquantizers(dimension, pq_m), nbits)
+
+        if compression == "fp16":
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16)
+        elif compression == "sq8":
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit)
+        elif compression == "flat":
+            index = faiss.IndexFlatL2(dimension)
+
+        if not index.is_trained:
+            index.train(embeddings)
         index.add(embeddings)
         return index
-    
+
+    def __pq_subquantizers(self, dimension, requested):
+        """
+        Pick a number of PQ subquantizers that divides the dimension.
+        """
+        if requested and dimension % requested == 0:
+            return requested
+        if requested:
+            logger.warning(f"PQ subquantizers {requested} does not divide dimension {dimension}, choosing automatically.")
+        target = max(1, dimension // 8)
+        return max(m for m in range(1, target + 1) if dimension % m == 0)
+
+    def __full_precision_vectors(self, cache_path):
+        """
+        Full-precision vectors kept for re-ranking compressed search results.
+        Memory-mapped from the embedding cache when available, so they stay on disk.
+        """
+        if self.rerank_factor <= 1:
+            return None
+        if cache_path is not None and cache_path.exists():
+            self.__rerank_rows = self.vector_ids
+            return np.load(cache_path, mmap_mode='r')
+        self.__rerank_rows = None
+        logger.info("Re-ranking vectors are kept in memory; set a cache directory to keep them on disk.")
+        return self.embeddings
+
+    def search(self, embeddings, top_k):
+        """
+        Search the index, re-ranking compressed results against full-precision vectors when enabled.
+
+        Args:
+            embeddings (np.ndarray): Query embeddings of shape (n, dimension).
+            top_k (int): Number of results per query.
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Squared L2 distances and section indices, as faiss.Index.search.
+        """
+        top_k = min(top_k, self.index.ntotal)
+        if self.compression == "flat" or self.embeddings is None:
+            return self.index.search(embeddings, top_k)
+
+        n_candidates = min(top_k * self.rerank_factor, self.index.ntotal)
+        _, candidates = self.index.search(embeddings, n_candidates)
+
+        distances = np.full((len(embeddings), top_k), np.inf, dtype='float32')
+        indices = np.full((len(embeddings), top_k), -1, dtype='int64')
+        for row, (query, ids) in enumerate(zip(embeddings, candidates)):
+            # Sorted ids turn memory-mapped reads into a forward scan
+            ids = np.sort(ids[ids >= 0])
+            rows = ids if self.__rerank_rows is None else self.__rerank_rows[ids]
+            exact = ((np.asarray(self.embeddings[rows], dtype='float32') - query) ** 2).sum(axis=1)
+            best = np.argsort(exact)[:top_k]
+            distances[row, :len(best)] = exact[best]
+            indices[row, :len(best)] = ids[best]
+        return distances, indices
+
     def get_index(self):
         """
         Returns the FAISS index for document retrieval.
@@ -106,8 +265,10 @@ class FAISSIndex:
         return self.model
 
 # Test usage
+# With INDEX_CACHE_DIR set, this also precomputes the embedding cache used by the API
 if __name__ == "__main__":
-    faiss_index = FAISSIndex()
+    from src import config
+    faiss_index = FAISSIndex(cache_dir=config.INDEX_CACHE_DIR or None)
     index = faiss_index.get_index()
     if index is not None:
         print(f"Index contains {index.ntotal} documents.")
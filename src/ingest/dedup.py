@@ -0,0 +1,170 @@
+# src/ingest/dedup.py
+
+# Near-duplicate detection for policy sections
+# Policy exports repeat boilerplate (contact-support paragraphs, legal footers) across sections and
+# policies. Exact duplicates are grouped by normalized text; near duplicates are found with MinHash/LSH
+# over word shingles and, when embeddings are given, confirmed by cosine similarity. Each group is
+# collapsed into one canonical section that lists every (policy, section) it came from.
+
+import hashlib
+import logging
+import re
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Smallest prime above 2**32: (a * x + b) % p stays within uint64 for 32-bit shingle hashes
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(2**32 - 1)
+_WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str):
+    """
+    Lowercase and strip punctuation and extra whitespace, so formatting differences do not matter.
+    """
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def shingles(text: str, k: int = 3):
+    """
+    Hash the word k-grams of a normalized text.
+
+    Args:
+        text (str): Normalized text.
+        k (int): Words per shingle.
+    Returns:
+        np.ndarray: Unique 32-bit shingle hashes as uint64.
+    """
+    words = text.split()
+    grams = [" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))]
+    return np.unique(np.array([zlib.crc32(gram.encode()) for gram in grams], dtype=np.uint64))
+
+
+class MinHasher:
+    """
+    MinHash signatures with num_perm universal hash functions; the fraction of equal
+    signature positions estimates the Jaccard similarity of two shingle sets.
+    """
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_hashes: np.ndarray):
+        hashes = (self.a[:, None] * shingle_hashes[None, :] + self.b[:, None]) % _PRIME
+        return hashes.min(axis=1)
+
+
+def lsh_candidates(signatures: np.ndarray, bands: int):
+    """
+    Candidate duplicate pairs from locality-sensitive hashing of MinHash signatures.
+    Signatures are cut into bands; sections sharing any band land in the same bucket.
+    Each bucket yields pairs with its first member only, which keeps large boilerplate
+    buckets linear instead of quadratic.
+
+    Args:
+        signatures (np.ndarray): Signatures of shape (n, num_perm).
+        bands (int): Number of bands; must divide num_perm.
+    Returns:
+        set[tuple[int, int]]: Candidate (i, j) pairs with i < j.
+    """
+    rows = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        for i, signature in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            buckets.setdefault(signature.tobytes(), []).append(i)
+        for members in buckets.values():
+            pairs.update((members[0], j) for j in members[1:])
+    return pairs
+
+
+def _find(parent: list, i: int):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def deduplicate_sections(sections: list, embeddings: np.ndarray = None, threshold: float = 0.8,
+                         embedding_threshold: float = 0.95, num_perm: int = 128, bands: int = 32):
+    """
+    Collapse exact and near-duplicate sections.
+
+    Two sections are duplicates if their normalized texts are equal, or if their estimated
+    Jaccard similarity is at least threshold and, when embeddings are given, their cosine
+    similarity is at least embedding_threshold. Groups are formed transitively; the first
+    section of each group (in input order) is kept as canonical.
+
+    Args:
+        sections (list[dict]): Sections as returned by load_policies.
+        embeddings (np.ndarray): Optional embeddings aligned with sections.
+        threshold (float): Minimum estimated Jaccard similarity of word shingles.
+        embedding_threshold (float): Minimum cosine similarity of embeddings.
+        num_perm (int): MinHash signature length.
+        bands (int): LSH bands; more bands find pairs with lower similarity.
+    Returns:
+        tuple[list[dict], list[int]]: Canonical sections, each with a "sources" list of
+        {"policy", "section"} for every section it replaces (itself first), and their
+        indices in the input.
+    """
+    n = len(sections)
+    parent = list(range(n))
+    texts = [normalize_text(section["text"]) for section in sections]
+
+    # Exact duplicates
+    first_seen = {}
+    for i, text in enumerate(texts):
+        digest = hashlib.sha1(text.encode()).digest()
+        if digest in first_seen:
+            parent[i] = first_seen[digest]
+        else:
+            first_seen[digest] = i
+
+    # Near duplicates among the distinct texts
+    distinct = sorted(first_seen.values())
+    if len(distinct) > 1:
+        hasher = MinHasher(num_perm)
+        signatures = np.stack([hasher.signature(shingles(texts[i])) for i in distinct])
+        if embeddings is not None:
+            vectors = embeddings[distinct]
+            vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        for a, b in lsh_candidates(signatures, bands):
+            if np.mean(signatures[a] == signatures[b]) < threshold:
+                continue
+            if embeddings is not None and float(vectors[a] @ vectors[b]) < embedding_threshold:
+                continue
+            root_a, root_b = _find(parent, distinct[a]), _find(parent, distinct[b])
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(_find(parent, i), []).append(i)
+
+    canonical, keep = [], []
+    for root in sorted(groups):
+        section = dict(sections[root])
+        section["sources"] = [{"policy": sections[i]["policy"], "section": sections[i]["section"]} for i in groups[root]]
+        canonical.append(section)
+        keep.append(root)
+
+    if len(keep) < n:
+        logger.info(f"Collapsed {n} sections into {len(keep)} ({n - len(keep)} duplicates removed)")
+    return canonical, keep
+
+
+# Test usage
+if __name__ == "__main__":
+    from src.ingest.loader import load_policies
+
+    loaded_sections = load_policies("./data/raw_docs")
+    unique_sections, _ = deduplicate_sections(loaded_sections)
+    for section in unique_sections:
+        if len(section["sources"]) > 1:
+            print(section["policy"], section["section"], "<-", section["sources"])
@@ -0,0 +1,322 @@
+# src/llm/batch.py
+
+# Offline bulk ticket processing for the RAG system
+# Streams tickets from JSONL, retrieves documents in large batches and runs LLM calls
+# through a worker pool, writing results incrementally with resumable checkpoints
+#
+# Usage:
+#   python -m src.llm.batch --input tickets.jsonl --output results.jsonl --workers 4
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.llm.pipeline import answer_from_docs
+from src.rag.retriever import retrieve_docs_batch
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+def count_lines(path: str):
+    """
+    Count lines in a file without parsing it, for progress and ETA reporting.
+
+    Args:
+        path (str): Path to the file.
+    Returns:
+        int: Number of lines, counting a final line without a trailing newline.
+    """
+    count = 0
+    last_chunk = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            count += chunk.count(b"\n")
+            last_chunk = chunk
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        count += 1
+    return count
+
+
+def read_checkpoint(path: str):
+    """
+    Read a checkpoint written by write_checkpoint.
+
+    Args:
+        path (str): Path to the checkpoint file.
+    Returns:
+        dict | None: The checkpoint, or None if it does not exist or is unreadable.
+    """
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def write_checkpoint(path: str, checkpoint: dict):
+    """
+    Atomically replace the checkpoint so a crash never leaves a partial file behind.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _error_response(message: str):
+    return {
+        "answer": message,
+        "references": [],
+        "action_required": "none"
+    }
+
+
+def _ticket_text(record: dict, text_fields: list):
+    """
+    Build the ticket text from one or more fields of an input record.
+    """
+    parts = [str(record[field]) for field in text_fields if record.get(field)]
+    return "\n\n".join(parts)
+
+
+def _resolve(ticket: str, docs: list):
+    """
+    Resolve a single ticket whose documents were already retrieved, mirroring the API's error handling.
+    """
+    if not ticket or not ticket.strip():
+        return _error_response("Error: Empty ticket provided.")
+    try:
+        return answer_from_docs(ticket, docs)
+    except Exception as e:
+        logger.error(f"Error processing ticket: {e}")
+        return _error_response(f"Error processing the ticket: {e}")
+
+
+def process_batch(lines: list, executor: ThreadPoolExecutor, text_fields: list, id_field: str = None, top_k: int = 1):
+    """
+    Parse a batch of input lines, retrieve their documents and submit their LLM calls.
+    Retrieval runs once for the whole batch; LLM calls run on the executor without waiting.
+
+    Args:
+        lines (list[tuple[int, str]]): Line numbers (1-based) and raw JSONL lines.
+        executor (ThreadPoolExecutor): Worker pool for LLM calls.
+        text_fields (list[str]): Record fields joined to form the ticket text.
+        id_field (str): Optional record field copied to the output as "id".
+        top_k (int): Number of documents retrieved per ticket.
+    Returns:
+        list[tuple[int, dict, Future | None]]: Line number, partial output record and the pending
+        response (None for invalid records, whose output is already complete), in input order.
+    """
+    outputs, tickets = [], []
+    for line_number, line in lines:
+        output = {"line": line_number}
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record is not a JSON object")
+        except ValueError:
+            logger.warning(f"Skipping invalid JSON on line {line_number}")
+            output.update(_error_response("Error: Invalid JSON record."))
+            record = None
+        if record is not None and id_field:
+            output["id"] = record.get(id_field)
+        outputs.append(output)
+        tickets.append(_ticket_text(record, text_fields) if record is not None else None)
+
+    pending = [i for i, ticket in enumerate(tickets) if ticket is not None]
+    docs_lists = retrieve_docs_batch([tickets[i] for i in pending], top_k=top_k)
+    futures = [None] * len(lines)
+    for i, docs in zip(pending, docs_lists):
+        futures[i] = executor.submit(_resolve, tickets[i], docs)
+    return [(line_number, output, future) for (line_number, _), output, future in zip(lines, outputs, futures)]
+
+
+def _write_completed(out, window: deque, max_pending: int = None):
+    """
+    Write the completed prefix of the window in input order.
+    With max_pending, also wait for the oldest tickets until at most max_pending remain.
+
+    Returns:
+        tuple[int, int | None]: Records written and the line number of the last one.
+    """
+    written, last_line = 0, None
+    while window:
+        line_number, output, future = window[0]
+        must_wait = max_pending is not None and len(window) > max_pending
+        if future is not None and not future.done() and not must_wait:
+            break
+        window.popleft()
+        if future is not None:
+            output.update(future.result())
+        _write_batch(out, [output])
+        written, last_line = written + 1, line_number
+    return written, last_line
+
+
+def _format_duration(seconds: float):
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def run_batch(input_path: str, output_path: str, checkpoint_path: str = None, workers: int = 4,
+              batch_size: int = 256, top_k: int = 1, text_fields: list = None, id_field: str = None,
+              resume: bool = True):
+    """
+    Process every ticket in a JSONL file and write results to an output JSONL file.
+
+    LLM calls run over a rolling window of tickets: the next batch is retrieved and submitted
+    while workers are still busy with the previous one, so no worker idles at batch boundaries.
+    Results are written in input order as soon as every earlier ticket has finished.
+
+    Progress is checkpointed about every batch_size results: the last input line written and the
+    size of the output file at that point. On resume, the output is truncated back to the
+    checkpointed size (dropping any partially written results) and those input lines are skipped.
+
+    Args:
+        input_path (str): JSONL file of tickets.
+        output_path (str): JSONL file results are appended to.
+        checkpoint_path (str): Checkpoint file; defaults to "<output_path>.checkpoint".
+        workers (int): Number of parallel LLM workers.
+        batch_size (int): Tickets retrieved per embedding/search call.
+        top_k (int): Number of documents retrieved per ticket.
+        text_fields (list[str]): Record fields joined to form the ticket text.
+        id_field (str): Optional record field copied to each output record as "id".
+        resume (bool): Resume from an existing checkpoint instead of starting over.
+    Returns:
+        dict: Run statistics.
+    """
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    text_fields = text_fields or ["ticket_text"]
+    input_key = str(Path(input_path).resolve())
+
+    checkpoint = read_checkpoint(checkpoint_path) if resume else None
+    if checkpoint and checkpoint.get("input") != input_key:
+        logger.warning(f"Checkpoint {checkpoint_path} belongs to {checkpoint.get('input')}, starting over.")
+        checkpoint = None
+    if checkpoint and not Path(output_path).exists():
+        logger.warning(f"Output {output_path} is missing, starting over.")
+        checkpoint = None
+
+    skip = checkpoint["processed"] if checkpoint else 0
+    total = count_lines(input_path)
+    if skip:
+        logger.info(f"Resuming from line {skip + 1} of {total}")
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    out = open(output_path, "r+b" if checkpoint else "wb")
+    if checkpoint:
+        out.truncate(checkpoint["output_bytes"])
+        out.seek(checkpoint["output_bytes"])
+
+    processed = skip
+    consumed = skip
+    unsaved = 0
+    window = deque()
+    start = time.perf_counter()
+
+    def write_completed(max_pending=None):
+        nonlocal processed, unsaved
+        written, last_line = _write_completed(out, window, max_pending)
+        if written:
+            processed = last_line
+            unsaved += written
+        if unsaved >= batch_size:
+            _checkpoint(checkpoint_path, input_key, processed, out)
+            _log_progress(processed - skip, processed, total, start)
+            unsaved = 0
+
+    try:
+        with open(input_path, "r", encoding="utf-8") as f, ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                batch = []
+                for line_number, line in enumerate(f, start=1):
+                    if line_number <= skip:
+                        continue
+                    if line.strip():
+                        batch.append((line_number, line))
+                    consumed = line_number
+                    if len(batch) >= batch_size:
+                        window.extend(process_batch(batch, executor, text_fields, id_field, top_k))
+                        batch = []
+                        # At most one batch stays queued behind the workers while the next is retrieved
+                        write_completed(max_pending=batch_size)
+                if batch:
+                    window.extend(process_batch(batch, executor, text_fields, id_field, top_k))
+                write_completed(max_pending=0)
+                processed = consumed
+            finally:
+                # Save the results already submitted, even when stopping on an error
+                write_completed(max_pending=0)
+                _checkpoint(checkpoint_path, input_key, processed, out)
+    finally:
+        out.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "processed": processed,
+        "resumed_from": skip,
+        "elapsed_seconds": round(elapsed, 3),
+        "tickets_per_second": round((processed - skip) / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Finished {processed - skip} tickets in {_format_duration(elapsed)}")
+    return stats
+
+
+def _write_batch(out, outputs: list):
+    out.write("".join(json.dumps(o, ensure_ascii=False) + "\n" for o in outputs).encode("utf-8"))
+
+
+def _checkpoint(checkpoint_path: str, input_key: str, processed: int, out):
+    # Results must be durable before the checkpoint claims them
+    out.flush()
+    os.fsync(out.fileno())
+    write_checkpoint(checkpoint_path, {"input": input_key, "processed": processed, "output_bytes": out.tell()})
+
+
+def _log_progress(done: int, processed: int, total: int, start: float):
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = _format_duration((total - processed) / rate) if rate > 0 else "unknown"
+    logger.info(f"Processed {processed}/{total} lines ({rate:.1f} tickets/s, ETA {eta})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve tickets from a JSONL file offline.")
+    parser.add_argument("--input", required=True, help="JSONL file with one ticket per line.")
+    parser.add_argument("--output", required=True, help="JSONL file to write results to.")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint).")
+    parser.add_argument("--workers", type=int, default=4, help="Number of parallel LLM workers.")
+    parser.add_argument("--batch-size", type=int, default=256, help="Tickets per retrieval batch.")
+    parser.add_argument("--top-k", type=int, default=1, help="Documents retrieved per ticket.")
+    parser.add_argument("--text-field", default="ticket_text",
+                        help="Comma-separated record fields joined to form the ticket text, e.g. title,body.")
+    parser.add_argument("--id-field", help="Record field copied to the output as 'id', e.g. request_id.")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore any checkpoint and start over.")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(
+        args.input,
+        args.output,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        top_k=args.top_k,
+        text_fields=[field.strip() for field in args.text_field.split(",") if field.strip()],
+        id_field=args.id_field,
+        resume=not args.no_resume,
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
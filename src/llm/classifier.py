@@ -0,0 +1,299 @@
+# src/llm/classifier.py
+
+# Action classifier for the RAG fast path
+# Predicts action_required from ticket embeddings so confident tickets can skip the LLM
+#
+# Usage:
+#   python -m src.llm.classifier train --data data/labeled_tickets.jsonl --model-out data/models/action_classifier.joblib
+#   python -m src.llm.classifier evaluate --data data/labeled_tickets_holdout.jsonl --model data/models/action_classifier.joblib
+
+import argparse
+import json
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Fewest calibration tickets per action for its precision estimate to be trusted
+MIN_CALIBRATION_PER_CLASS = 10
+
+class ActionClassifier:
+    """
+    Logistic regression over ticket embeddings predicting action_required.
+    Predictions are only trusted above a confidence threshold calibrated on predictions the
+    model did not train on: a held-out set, or out-of-fold probabilities.
+
+    Attributes:
+        threshold (float): Minimum predicted probability for a prediction to be served.
+        model (LogisticRegression): The underlying scikit-learn model.
+    """
+    def __init__(self, threshold: float = 1.0, C: float = 1.0):
+        self.threshold = threshold
+        self.C = C
+        self.model = None
+
+    @property
+    def classes(self):
+        """
+        Returns the action labels known to the classifier.
+        """
+        return [] if self.model is None else list(self.model.classes_)
+
+    def fit(self, embeddings: np.ndarray, labels: list):
+        """
+        Train the classifier.
+
+        Args:
+            embeddings (np.ndarray): Ticket embeddings of shape (n, dimension).
+            labels (list[str]): The action_required label of each ticket.
+        Returns:
+            ActionClassifier: self, for chaining.
+        """
+        from sklearn.linear_model import LogisticRegression
+
+        if len(set(labels)) < 2:
+            raise ValueError("At least two distinct actions are required to train the classifier.")
+        self.model = LogisticRegression(C=self.C, max_iter=1000)
+        self.model.fit(embeddings, labels)
+        return self
+
+    def predict(self, embeddings: np.ndarray):
+        """
+        Predict actions and their confidence.
+
+        Args:
+            embeddings (np.ndarray): Ticket embeddings of shape (n, dimension).
+        Returns:
+            tuple[list[str], np.ndarray]: Predicted actions and their probabilities.
+        """
+        if self.model is None:
+            raise RuntimeError("Classifier has not been trained.")
+        return self._best_actions(self.model.predict_proba(embeddings))
+
+    def _best_actions(self, probabilities: np.ndarray):
+        """
+        Most probable action and its probability for each row, with columns ordered as classes.
+        """
+        best = probabilities.argmax(axis=1)
+        actions = [str(self.model.classes_[i]) for i in best]
+        return actions, probabilities[np.arange(len(best)), best]
+
+    def out_of_fold_probabilities(self, embeddings: np.ndarray, labels: list, folds: int = 5, seed: int = 0):
+        """
+        Class probabilities for each ticket from a model trained on the other folds, so every
+        labeled ticket can be used for calibration without scoring the model on its own training data.
+        Columns follow the classes of a model fitted on all labels.
+
+        Args:
+            embeddings (np.ndarray): Ticket embeddings.
+            labels (list[str]): Action labels.
+            folds (int): Number of cross-validation folds.
+            seed (int): Shuffle seed for the folds.
+        Returns:
+            np.ndarray: Probabilities of shape (n, number of classes).
+        """
+        import warnings
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import KFold, cross_val_predict
+
+        splitter = KFold(n_splits=min(folds, len(labels)), shuffle=True, random_state=seed)
+        with warnings.catch_warnings():
+            # Rare actions can be missing from a training fold; their probability is then 0 for that fold
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return cross_val_predict(LogisticRegression(C=self.C, max_iter=1000), embeddings, np.asarray(labels),
+                                     cv=splitter, method="predict_proba")
+
+    def calibrate(self, embeddings: np.ndarray, labels: list, target_precision: float = 0.95,
+                  probabilities: np.ndarray = None, min_per_class: int = MIN_CALIBRATION_PER_CLASS):
+        """
+        Pick the lowest confidence threshold whose accepted predictions reach the target precision
+        on calibration tickets. Lower thresholds serve more traffic without the LLM.
+
+        The fast path stays off (threshold 1.0) when any action the model predicts has fewer than
+        min_per_class calibration tickets, since its precision cannot be estimated.
+
+        Args:
+            embeddings (np.ndarray): Calibration ticket embeddings, not used to train the model.
+            labels (list[str]): Calibration action labels.
+            target_precision (float): Required accuracy on tickets served by the fast path.
+            probabilities (np.ndarray): Out-of-fold probabilities to use instead of predicting embeddings.
+            min_per_class (int): Fewest calibration tickets required per action.
+        Returns:
+            float: The selected threshold (1.0 if no threshold reaches the target).
+        """
+        self.threshold = 1.0
+        counts = {action: labels.count(action) for action in self.classes}
+        too_few = {action: count for action, count in counts.items() if count < min_per_class}
+        if too_few:
+            logger.warning(
+                f"Fast path disabled: too few calibration tickets to estimate precision for {too_few} "
+                f"(need at least {min_per_class} per action). Label more tickets and retrain."
+            )
+            return self.threshold
+
+        actions, confidences = self.predict(embeddings) if probabilities is None else self._best_actions(probabilities)
+        correct = np.array([a == l for a, l in zip(actions, labels)], dtype=float)
+
+        # Walk candidate thresholds from most to least confident, tracking precision of the accepted set
+        order = np.argsort(-confidences)
+        precision = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+
+        for i in range(len(order)):
+            # Only cut between distinct confidences so ties are accepted or rejected together
+            if i + 1 < len(order) and confidences[order[i + 1]] == confidences[order[i]]:
+                continue
+            if precision[i] >= target_precision:
+                self.threshold = float(confidences[order[i]])
+        return self.threshold
+
+    def evaluate(self, embeddings: np.ndarray, labels: list, probabilities: np.ndarray = None):
+        """
+        Measure how the classifier would behave as a fast path at its current threshold.
+
+        Args:
+            embeddings (np.ndarray): Ticket embeddings.
+            labels (list[str]): Expected action labels.
+            probabilities (np.ndarray): Out-of-fold probabilities to use instead of predicting embeddings.
+        Returns:
+            dict: Overall accuracy, fast-path coverage and accuracy on the tickets it would serve.
+        """
+        actions, confidences = self.predict(embeddings) if probabilities is None else self._best_actions(probabilities)
+        correct = np.array([a == l for a, l in zip(actions, labels)])
+        accepted = confidences >= self.threshold
+        return {
+            "tickets": len(labels),
+            "threshold": self.threshold,
+            "accuracy": float(correct.mean()) if len(labels) else 0.0,
+            "fast_path_fraction": float(accepted.mean()) if len(labels) else 0.0,
+            "fast_path_accuracy": float(correct[accepted].mean()) if accepted.any() else 0.0,
+        }
+
+    def save(self, path: str):
+        """
+        Persist the classifier and its threshold with joblib.
+        """
+        import joblib
+        from pathlib import Path
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({"model": self.model, "threshold": self.threshold, "C": self.C}, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Load a classifier saved with save().
+        """
+        import joblib
+
+        state = joblib.load(path)
+        classifier = cls(threshold=state["threshold"], C=state.get("C", 1.0))
+        classifier.model = state["model"]
+        return classifier
+
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+def get_action_classifier(path: str):
+    """
+    Return the classifier stored at path, loading it once per process.
+    Load failures are logged and cached so the fast path stays disabled instead of retrying per ticket.
+
+    Args:
+        path (str): Path to a classifier saved with ActionClassifier.save().
+    Returns:
+        ActionClassifier | None: The classifier, or None if path is empty or loading failed.
+    """
+    if not path:
+        return None
+    if path not in _loaded:
+        with _load_lock:
+            if path not in _loaded:
+                try:
+                    _loaded[path] = ActionClassifier.load(path)
+                    logger.info(f"Loaded action classifier from {path} (threshold {_loaded[path].threshold:.3f})")
+                except Exception as e:
+                    logger.error(f"Error loading action classifier {path}: {e}")
+                    _loaded[path] = None
+    return _loaded[path]
+
+
+def load_labeled_tickets(path: str, text_field: str = "ticket_text", label_field: str = "action_required"):
+    """
+    Load labeled tickets from a JSONL file.
+
+    Args:
+        path (str): JSONL file with one ticket per line.
+        text_field (str): Key holding the ticket text.
+        label_field (str): Key holding the expected action.
+    Returns:
+        tuple[list[str], list[str]]: Ticket texts and labels.
+    """
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping invalid JSON on line {line_number} of {path}")
+                continue
+            if not record.get(text_field) or not record.get(label_field):
+                logger.warning(f"Skipping line {line_number} of {path}: missing {text_field} or {label_field}")
+                continue
+            texts.append(record[text_field])
+            labels.append(record[label_field])
+    return texts, labels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or evaluate the action_required fast-path classifier.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train = subparsers.add_parser("train", help="Train and calibrate a classifier on labeled tickets.")
+    train.add_argument("--data", required=True, help="JSONL file with ticket_text and action_required fields.")
+    train.add_argument("--model-out", required=True, help="Where to write the trained classifier.")
+    train.add_argument("--target-precision", type=float, default=0.95,
+                       help="Required accuracy on tickets served without the LLM.")
+    train.add_argument("--folds", type=int, default=5, help="Cross-validation folds used for calibration.")
+    train.add_argument("--min-per-class", type=int, default=MIN_CALIBRATION_PER_CLASS,
+                       help="Fewest labeled tickets per action required to enable the fast path.")
+    train.add_argument("--C", type=float, default=1.0, help="Inverse regularization strength.")
+    train.add_argument("--seed", type=int, default=0)
+
+    evaluate = subparsers.add_parser("evaluate", help="Report accuracy and fast-path coverage on labeled tickets.")
+    evaluate.add_argument("--data", required=True,
+                          help="JSONL file with ticket_text and action_required fields, not used for training.")
+    evaluate.add_argument("--model", required=True, help="Path to a trained classifier.")
+
+    args = parser.parse_args(argv)
+
+    # Imported here so the retriever (and its model) is only loaded when the CLI actually runs
+    from src.rag.retriever import embed_tickets
+
+    texts, labels = load_labeled_tickets(args.data)
+    if not texts:
+        parser.error(f"No labeled tickets found in {args.data}")
+    embeddings = embed_tickets(texts)
+
+    if args.command == "train":
+        # Calibrate on out-of-fold probabilities, which estimate how the model fitted on all
+        # tickets behaves on tickets it has not seen
+        classifier = ActionClassifier(C=args.C).fit(embeddings, labels)
+        probabilities = classifier.out_of_fold_probabilities(embeddings, labels, args.folds, args.seed)
+        classifier.calibrate(embeddings, labels, args.target_precision, probabilities, args.min_per_class)
+        report = classifier.evaluate(embeddings, labels, probabilities)
+        classifier.save(args.model_out)
+        logger.info(f"Saved action classifier to {args.model_out}")
+    else:
+        classifier = ActionClassifier.load(args.model)
+        report = classifier.evaluate(embeddings, labels)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# src/llm/fake_llm.py
+
+# Deterministic stand-in for the Ollama model
+# Used by benchmarks and load tests to exercise the pipeline without a local LLM.
+# Select it in the API with LLM_BACKEND=fake; FAKE_LLM_LATENCY sets the simulated generation time.
+
+import json
+import math
+import random
+import re
+import threading
+import time
+
+# Matches the context headers written by build_prompt: "<policy> — Section <section> (<title>):"
+_CONTEXT_HEADER = re.compile(r"^\s*(.+?) — Section (\S+) \((.*)\):\s*$", re.MULTILINE)
+
+
+def fake_llm_response(prompt: str):
+    """
+    Build a well-formed MCP response from the documents in a prompt.
+    The output depends only on the prompt, so repeated runs are identical.
+
+    Args:
+        prompt (str): Prompt built by build_prompt.
+    Returns:
+        str: JSON response text, as the LLM would print it.
+    """
+    references = [f"Policy: {policy}, Section {section}" for policy, section, _ in _CONTEXT_HEADER.findall(prompt)]
+    return json.dumps({
+        "answer": "This is a simulated answer based on the retrieved documentation.",
+        "references": references,
+        "action_required": "none"
+    })
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution.
+
+    Supported forms (all values in seconds):
+        "0.5" or "fixed:0.5"         constant delay
+        "uniform:0.2,0.8"            uniform between the two bounds
+        "normal:0.5,0.1"             normal with mean and standard deviation, clamped at 0
+        "lognormal:0.5,0.4"          log-normal with median and sigma (long right tail, like real LLMs)
+        "exponential:0.5"            exponential with the given mean
+
+    Args:
+        spec (str | float): Distribution spec, or a number for a constant delay.
+    Returns:
+        callable: Function taking a random.Random and returning a delay in seconds.
+    """
+    if isinstance(spec, (int, float)):
+        value = float(spec)
+        return lambda rng: value
+
+    name, _, params = str(spec).strip().partition(":")
+    if not params:
+        name, params = "fixed", name
+    try:
+        values = [float(v) for v in params.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    if name == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if name == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if name == "lognormal" and len(values) == 2 and values[0] > 0:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if name == "exponential" and len(values) == 1 and values[0] > 0:
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class FakeLLM:
+    """
+    Callable with the same signature as call_llm that returns fake_llm_response after a simulated delay.
+
+    Attributes:
+        latency (str | float): Latency distribution, see parse_latency.
+        failure_rate (float): Fraction of calls that fail by returning no output, as call_llm does on errors.
+        calls (int): Number of calls made.
+    """
+    def __init__(self, latency=0.0, failure_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._sample_latency = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str, model: str = "llama3.2:1b"):
+        with self._lock:
+            self.calls += 1
+            delay = self._sample_latency(self._rng)
+            failed = self.failure_rate > 0 and self._rng.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        return "" if failed else fake_llm_response(prompt)
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+def get_fake_llm(latency="0", failure_rate: float = 0.0):
+    """
+    Return a shared FakeLLM for the given settings, so call counts and the random
+    stream persist across requests.
+    """
+    key = (str(latency), failure_rate)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = FakeLLM(latency, failure_rate)
+        return _instances[key]
@@ -3,15 +3,27 @@
 # Pipeline module for RAG system
 # Integrates retriever and generator components
 
-from src.rag.retriever import retrieve_docs
+from src.rag.retriever import retrieve_docs, embed_ticket
+from src.llm.classifier import get_action_classifier
+from src.llm.fake_llm import get_fake_llm
+from src import config
+from src import audit
+from src.metrics import stage, PROMPT_CHARS, RESPONSE_CHARS, LLM_FAILURES, PARSE_FAILURES, EMPTY_RETRIEVALS, RESPONSES
 import subprocess
 import json
+import time
 import regex as re
 import logging
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Ollama model used to generate answers
+LLM_MODEL = "llama3.2:1b"
+
+# Monotonic time of the last LLM call, used by warm-up to detect idle periods
+last_llm_call = 0.0
+
 def build_prompt(ticket: str, docs: list):
     """
     Build the prompt for the LLM.
@@ -81,9 +93,10 @@ def build_prompt(ticket: str, docs: list):
     return prompt.strip()
 
 
-def call_llm(prompt: str, model: str = "llama3.2:1b"):
+def call_llm(prompt: str, model: str = LLM_MODEL):
     """
     Call Ollama model locally to generate a response based on the prompt.
+    With LLM_BACKEND=fake, a simulated response is returned instead.
 
     Args:
         prompt (str): The input prompt for the LLM.
@@ -92,9 +105,15 @@ def call_llm(prompt: str, model: str = "llama3.2:1b"):
     Returns:
         str: The raw response from the LLM.
     """
+    global last_llm_call
+    last_llm_call = time.monotonic()
+
+    if config.LLM_BACKEND == "fake":
+        return get_fake_llm(config.FAKE_LLM_LATENCY, config.FAKE_LLM_FAILURE_RATE)(prompt, model)
+
     try:
         result = subprocess.run(
-            ["ollama", "run", model],
+            ["ollama", "run", model, "--keepalive", config.OLLAMA_KEEP_ALIVE],
             input=prompt.encode(),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -130,6 +149,7 @@ def extract_json(response: str):
 
     if not matches:
         logging.warning("No JSON object found in LLM response.")
+        PARSE_FAILURES.inc()
         return {
             "answer": "Error: Unable to parse LLM response.",
             "references": [],
@@ -143,6 +163,7 @@ def extract_json(response: str):
         return json.loads(final_json)
     except json.JSONDecodeError:
         logging.warning("JSON decoding failed for LLM response.")
+        PARSE_FAILURES.inc()
         return {
             "answer": "Error: Unable to parse LLM response.",
             "references": [],
@@ -150,6 +171,71 @@ def extract_json(response: str):
         }
 
 
+def format_reference(doc: dict):
+    """
+    Format a retrieved document as an MCP reference string.
+
+    Args:
+        doc (dict): Retrieved document with 'policy' and 'section'.
+
+    Returns:
+        str: Reference in the form "Policy: <policy>, Section <section>".
+    """
+    return f"Policy: {doc['policy']}, Section {doc['section']}"
+
+
+# Next step told to the customer for each action the fast path can answer;
+# tickets predicted as any other action go to the LLM
+ACTION_NEXT_STEPS = {
+    "reset_password": "You can reset your password with a new reset link; we will send one to the email address on your account.",
+    "check_refund_status": "We will check the status of your refund and update you once it has been processed.",
+    "escalate_to_abuse_team": "Your ticket has been escalated to our abuse team, who will review it and contact you.",
+    "update_payment_method": "Please update the payment method on your account so the pending charge can be processed.",
+    "verify_identity": "We need to verify your identity before we can continue; please follow the verification steps for your account.",
+    "unlock_account": "We will unlock your account once your identity is confirmed; you can then sign in again.",
+    "none": "No action is needed on your account.",
+}
+
+
+def fast_path_response(ticket: str, docs: list):
+    """
+    Answer the ticket without the LLM when the action classifier is confident.
+    The answer states the next step for the predicted action (see ACTION_NEXT_STEPS)
+    and points to the top retrieved section by title.
+
+    Args:
+        ticket (str): The user input ticket.
+        docs (list): Retrieved documents, most relevant first.
+
+    Returns:
+        dict | None: MCP response, or None if the ticket should go to the LLM.
+    """
+    classifier = get_action_classifier(config.ACTION_CLASSIFIER_PATH)
+    if classifier is None:
+        return None
+
+    try:
+        actions, confidences = classifier.predict(embed_ticket(ticket))
+    except Exception as e:
+        logger.error(f"Action classifier failed, falling back to LLM: {e}")
+        return None
+
+    threshold = config.ACTION_CLASSIFIER_THRESHOLD or classifier.threshold
+    if confidences[0] < threshold:
+        return None
+    next_step = ACTION_NEXT_STEPS.get(actions[0])
+    if next_step is None:
+        logger.info(f"No fast-path answer for action {actions[0]}, falling back to LLM")
+        return None
+
+    top_doc = docs[0]
+    return {
+        "answer": f"{next_step} See {top_doc['policy']}, Section {top_doc['section']} ({top_doc['title']}) for details.",
+        "references": [format_reference(top_doc)],
+        "action_required": actions[0]
+    }
+
+
 def generate_response(ticket: str, top_k: int = 1):
     """
     Minimal RAG pipeline to:
@@ -158,6 +244,9 @@ def generate_response(ticket: str, top_k: int = 1):
     3. Call the LLM with the constructed prompt.
     4. Return the LLM's structured response.
 
+    Tickets the action classifier is confident about are answered with a
+    templated next step for the predicted action, without calling the LLM.
+
     Args:
         ticket (str): The user input ticket.
         top_k (int): Number of top relevant documents to retrieve.
@@ -175,19 +264,63 @@ def generate_response(ticket: str, top_k: int = 1):
 
     # Retrieve relevant documents based on the ticket
     docs = retrieve_docs(ticket, top_k=top_k)
+
+    return answer_from_docs(ticket, docs)
+
+
+def answer_from_docs(ticket: str, docs: list):
+    """
+    Produce the structured response for a ticket whose documents were already retrieved.
+    Used by generate_response and by batch processing, which retrieves many tickets at once.
+
+    Args:
+        ticket (str): The user input ticket.
+        docs (list): Retrieved documents, most relevant first.
+
+    Returns:
+        dict: The structured response.
+    """
+    audit.note(sections=[
+        {"policy": doc["policy"], "section": doc["section"], "distance": doc.get("distance")} for doc in docs
+    ])
     if not docs:
+        EMPTY_RETRIEVALS.inc()
+        RESPONSES.inc(served_by="none")
+        audit.note(served_by="none")
         return {
             "answer": "No relevant documents found to answer the ticket.",
             "references": [],
             "action_required": "none"
         }
-    
+
+    # Serve confident tickets without the LLM
+    with stage("fast_path"):
+        fast_response = fast_path_response(ticket, docs)
+    if fast_response is not None:
+        RESPONSES.inc(served_by="fast_path")
+        audit.note(served_by="fast_path")
+        return fast_response
+
     # Build prompt and call LLM
-    prompt = build_prompt(ticket, docs)
-    response = call_llm(prompt)
-    
+    with stage("build_prompt"):
+        prompt = build_prompt(ticket, docs)
+    PROMPT_CHARS.observe(len(prompt))
+
+    try:
+        with stage("call_llm"):
+            response = call_llm(prompt)
+    except Exception:
+        LLM_FAILURES.inc()
+        raise
+    if not response:
+        LLM_FAILURES.inc()
+    RESPONSE_CHARS.observe(len(response or ""))
+    audit.note(served_by="llm", llm_output=response)
+
     # Extract JSON from LLM response
-    response_json = extract_json(response)
+    with stage("extract_json"):
+        response_json = extract_json(response)
+    RESPONSES.inc(served_by="llm")
 
     return response_json
 
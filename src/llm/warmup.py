@@ -0,0 +1,139 @@
+# src/llm/warmup.py
+
+# Warm-up and keep-alive management for the RAG system
+# Loads the embedding model, index and Ollama model before traffic arrives,
+# then keeps the Ollama model resident during idle periods
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+
+from src import config
+from src.llm import pipeline
+from src.rag import retriever
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Seconds between retries while a component fails to warm up
+RETRY_INTERVAL = 10.0
+
+
+def _ollama_url(path: str):
+    host = config.OLLAMA_HOST.rstrip("/")
+    if not host.startswith(("http://", "https://")):
+        host = f"http://{host}"
+    return f"{host}{path}"
+
+
+def preload_llm(model: str = None, keep_alive: str = None, timeout: float = 300.0):
+    """
+    Load the model into Ollama without generating anything, and set how long it stays loaded.
+    A generate request with no prompt loads the model and applies keep_alive.
+
+    Args:
+        model (str): Ollama model name; defaults to the pipeline's model.
+        keep_alive (str): Ollama duration, e.g. "30m"; defaults to OLLAMA_KEEP_ALIVE.
+        timeout (float): Seconds to wait, including model load time.
+    Returns:
+        bool: True if Ollama loaded the model.
+    """
+    payload = {"model": model or pipeline.LLM_MODEL, "keep_alive": keep_alive or config.OLLAMA_KEEP_ALIVE}
+    request = urllib.request.Request(
+        _ollama_url("/api/generate"),
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            json.loads(response.read() or b"{}")
+        return True
+    except Exception as e:
+        logger.warning(f"Error preloading Ollama model {payload['model']}: {e}")
+        return False
+
+
+class WarmupManager:
+    """
+    Background warm-up of the embedding model, FAISS index and LLM.
+
+    After startup warm-up, the LLM keep-alive is refreshed whenever no LLM call has been
+    made for KEEP_ALIVE_INTERVAL seconds, so Ollama does not unload an idle model.
+
+    Attributes:
+        status (dict[str, bool]): Warm state per component ("embedding", "llm").
+    """
+    def __init__(self):
+        self.status = {"embedding": False, "llm": False}
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_refresh = 0.0
+
+    @property
+    def ready(self):
+        """
+        Whether every component is warm.
+        """
+        return all(self.status.values())
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def warm_embedding(self):
+        try:
+            self.status["embedding"] = retriever.warm_up()
+        except Exception as e:
+            logger.error(f"Error warming up retriever: {e}")
+            self.status["embedding"] = False
+        return self.status["embedding"]
+
+    def warm_llm(self):
+        # The fake backend has nothing to load
+        self.status["llm"] = config.LLM_BACKEND == "fake" or preload_llm()
+        # Only a successful load counts, so a failed refresh is retried instead of waiting a full interval
+        if self.status["llm"]:
+            self._last_refresh = time.monotonic()
+        return self.status["llm"]
+
+    def refresh_if_idle(self):
+        """
+        Refresh the LLM keep-alive if there has been no LLM call or refresh for KEEP_ALIVE_INTERVAL,
+        or right away if the LLM is cold because the last refresh failed.
+
+        Returns:
+            bool: True if a refresh was sent.
+        """
+        now = time.monotonic()
+        last_activity = max(pipeline.last_llm_call, self._last_refresh)
+        if self.status["llm"] and now - last_activity < config.KEEP_ALIVE_INTERVAL:
+            return False
+        self.warm_llm()
+        return True
+
+    def _run(self):
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            if not self.status["embedding"]:
+                self.warm_embedding()
+            if not self.status["llm"]:
+                self.warm_llm()
+            if self.ready:
+                break
+            self._stop.wait(RETRY_INTERVAL)
+        if self.ready:
+            logger.info(f"Warm-up finished in {time.perf_counter() - started:.1f}s")
+
+        # Keep-alive loop; a failed refresh marks the LLM cold and is retried every RETRY_INTERVAL
+        poll = max(1.0, min(config.KEEP_ALIVE_INTERVAL / 10, 30.0))
+        while not self._stop.wait(poll if self.status["llm"] else RETRY_INTERVAL):
+            self.refresh_if_idle()
@@ -0,0 +1,210 @@
+# src/metrics.py
+
+# Metrics module for RAG system
+# Per-stage latency histograms and failure counters, rendered in the Prometheus text format
+# Stage timings of the current request are also collected for the Server-Timing header
+
+import contextvars
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from src import config
+
+# Buckets in seconds, spanning cache hits to slow LLM generations
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Buckets in characters for prompt and response sizes
+SIZE_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+_registry = []
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = ""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """
+    Monotonically increasing counter, optionally split by labels.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Help text shown in /metrics.
+        labelnames (tuple[str]): Names of the labels passed to inc().
+    """
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {} if labelnames else {(): 0.0}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not config.METRICS_ENABLED:
+            return
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Histogram with fixed upper bounds, optionally split by labels.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Help text shown in /metrics.
+        labelnames (tuple[str]): Names of the labels passed to observe().
+        buckets (tuple[float]): Sorted bucket upper bounds; +Inf is implicit.
+    """
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        if not config.METRICS_ENABLED:
+            return
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        return sum(series[0]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(series[0]), series[1])) for key, series in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+def render_metrics():
+    """
+    Render every registered metric in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics page.
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds", "Time spent in each stage of ticket resolution.", ("stage",))
+PROMPT_CHARS = Histogram(
+    "rag_prompt_chars", "Size of prompts sent to the LLM, in characters.", buckets=SIZE_BUCKETS)
+RESPONSE_CHARS = Histogram(
+    "rag_llm_response_chars", "Size of raw LLM responses, in characters.", buckets=SIZE_BUCKETS)
+LLM_FAILURES = Counter(
+    "rag_llm_failures_total", "LLM calls that raised or returned no output.")
+PARSE_FAILURES = Counter(
+    "rag_parse_failures_total", "LLM responses that did not contain a valid JSON object.")
+EMPTY_RETRIEVALS = Counter(
+    "rag_empty_retrievals_total", "Tickets for which no documents were retrieved.")
+RESPONSES = Counter(
+    "rag_responses_total", "Resolved tickets by what produced the answer (llm, fast_path or none).", ("served_by",))
+AUDIT_RECORDS = Counter(
+    "rag_audit_records_total", "Audit records by outcome (written, dropped or failed).", ("result",))
+
+
+_stage_timings = contextvars.ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a pipeline stage.
+    The duration is recorded in the stage histogram and, when a request is collecting
+    timings (see collect_stage_timings), added to that request's timings.
+
+    Args:
+        name (str): Stage name, e.g. "embed" or "call_llm".
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _stage_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def collect_stage_timings():
+    """
+    Collect the durations of stages run in the current context.
+
+    Yields:
+        dict[str, float]: Stage name to total seconds, filled in as stages complete.
+    """
+    timings = {}
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
+
+
+def format_server_timing(timings: dict):
+    """
+    Format stage timings as a Server-Timing header value.
+
+    Args:
+        timings (dict[str, float]): Stage name to seconds.
+    Returns:
+        str: e.g. "embed;dur=12.3, search;dur=0.4".
+    """
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
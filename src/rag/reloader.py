@@ -0,0 +1,141 @@
+# src/rag/reloader.py
+
+# Hot reload of the policy index for the RAG system
+# Rebuilds the FAISS index in a background thread when policy files change (or on request)
+# and swaps it into the retriever atomically, without blocking or restarting the API
+
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+
+from src import config
+from src.rag import retriever
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def policy_fingerprint(policy_dir: str):
+    """
+    Fingerprint the policy files in a directory from their names, sizes and modification times.
+
+    Args:
+        policy_dir (str): Directory containing policy JSON files.
+    Returns:
+        str: Hex digest that changes whenever a policy file is added, removed or modified.
+    """
+    digest = hashlib.sha256()
+    for file in sorted(Path(policy_dir).glob("*.json")):
+        try:
+            stat = file.stat()
+        except OSError:
+            continue
+        digest.update(f"{file.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+class PolicyReloader:
+    """
+    Background rebuild and swap of the retriever's FAISS index.
+
+    Requests keep using the index they started with: the retriever reads its index once per
+    call, so in-flight requests finish on the old snapshot and later requests see the new one.
+    The old index is freed once the last request holding it completes.
+
+    Attributes:
+        policy_dir (str): Directory of policy files to index.
+        interval (float): Seconds between change checks; 0 only reloads on request.
+        status (dict): Generation, section count, time and error of the last reload.
+    """
+    def __init__(self, policy_dir: str = None, interval: float = None):
+        self.policy_dir = policy_dir or config.POLICY_DIR
+        self.interval = config.POLICY_RELOAD_INTERVAL if interval is None else interval
+        self.status = {"generation": 0, "sections": None, "reloaded_at": None, "last_error": None, "reloading": False}
+        self._fingerprint = policy_fingerprint(self.policy_dir)
+        self._requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="policy-reloader", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_reload(self):
+        """
+        Schedule a rebuild without waiting for it. Requests made during a rebuild are
+        coalesced into a single follow-up rebuild.
+        """
+        self.start()
+        self._requested.set()
+
+    def reload(self):
+        """
+        Rebuild the index from policy_dir and swap it into the retriever.
+        The embedding model already loaded by the retriever is reused. If no index has been
+        built yet, nothing is built here: the index is marked stale and the retriever builds
+        it from the current files on first use. If the current index is a failed build (no
+        policy sections at startup, or the model failed to load), the model is loaded here so
+        the service recovers without a restart.
+
+        Returns:
+            bool: True if a new index was swapped in; False if no index was loaded yet, or if the
+            build produced no index, in which case the current index keeps serving.
+        """
+        self.status["reloading"] = True
+        started = time.perf_counter()
+        # Recorded even if the build fails, so the watcher retries only after the files change again
+        self._fingerprint = policy_fingerprint(self.policy_dir)
+        try:
+            current = retriever.get_built_index()
+            if current is None:
+                retriever.mark_faiss_index_stale()
+                logger.info("Policy index not built yet; it will be built from the current files on first use")
+                return False
+            # A failed build has no model to reuse; build_faiss_index loads it
+            new_index = retriever.build_faiss_index(policy_dir=self.policy_dir, model=current.get_model())
+            if new_index.get_index() is None or new_index.get_model() is None:
+                raise RuntimeError(f"No policy sections could be indexed from {self.policy_dir}")
+
+            retriever.set_faiss_index(new_index)
+            self.status.update({
+                "generation": self.status["generation"] + 1,
+                "sections": new_index.get_index().ntotal,
+                "reloaded_at": time.time(),
+                "last_error": None,
+            })
+            logger.info(f"Reloaded policy index with {new_index.get_index().ntotal} sections "
+                        f"in {time.perf_counter() - started:.2f}s")
+            return True
+        except Exception as e:
+            logger.error(f"Policy reload failed, keeping the current index: {e}")
+            self.status["last_error"] = str(e)
+            return False
+        finally:
+            self.status["reloading"] = False
+
+    def check_for_changes(self):
+        """
+        Returns:
+            bool: True if policy files changed since the last reload attempt.
+        """
+        return policy_fingerprint(self.policy_dir) != self._fingerprint
+
+    def _run(self):
+        while not self._stop.is_set():
+            requested = self._requested.wait(self.interval if self.interval > 0 else None)
+            if self._stop.is_set():
+                break
+            self._requested.clear()
+            if requested or self.check_for_changes():
+                self.reload()
@@ -4,17 +4,165 @@
 # Utilizes FAISS index of sample documents for demonstration
 
 import numpy as np
+import threading
+from collections import OrderedDict
 from src.index.faiss_index import FAISSIndex
+from src.metrics import stage
+from src import config
 import logging
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# Load FAISS components
-faiss_index = FAISSIndex()
-index = faiss_index.get_index()
-model = faiss_index.get_model()
-section_map = faiss_index.get_section_map()
+# FAISS components are built on first use (see get_faiss_index),
+# so importing this module does not load the embedding model
+_faiss_index = None
+_faiss_index_lock = threading.Lock()
+# Bumped when policy files change; a lazy build that started before the bump is redone
+_faiss_index_generation = 0
+
+def get_faiss_index():
+    """
+    Return the FAISS index used for retrieval, building it on the first call.
+
+    Returns:
+        FAISSIndex: The retriever's index, model and section map.
+    """
+    global _faiss_index
+    if _faiss_index is None:
+        with _faiss_index_lock:
+            while _faiss_index is None:
+                generation = _faiss_index_generation
+                faiss_index = build_faiss_index()
+                if generation == _faiss_index_generation:
+                    _faiss_index = faiss_index
+    return _faiss_index
+
+def get_built_index():
+    """
+    Return the current index without building it.
+
+    Returns:
+        FAISSIndex | None: The current index, or None if no index has been built yet.
+        A build that failed (no policy sections, model load error) is returned as is.
+    """
+    return _faiss_index
+
+def index_ready(faiss_index):
+    """
+    Whether an index was built with its vectors and embedding model.
+    """
+    return faiss_index is not None and faiss_index.get_index() is not None and faiss_index.get_model() is not None
+
+def mark_faiss_index_stale():
+    """
+    Record that the policy files changed before any index was built, so a lazy build
+    already in progress is discarded and redone from the current files.
+    """
+    global _faiss_index_generation
+    _faiss_index_generation += 1
+
+def build_faiss_index(policy_dir: str = None, model=None):
+    """
+    Build a FAISS index with the configured policy directory, embedding cache and compression.
+
+    Args:
+        policy_dir (str): Directory of policy files; defaults to POLICY_DIR.
+        model (SentenceTransformer): Preloaded embedding model to reuse; loaded if omitted.
+
+    Returns:
+        FAISSIndex: The new index.
+    """
+    return FAISSIndex(
+        policy_dir=policy_dir or config.POLICY_DIR,
+        model=model,
+        cache_dir=config.INDEX_CACHE_DIR or None,
+        compression=config.INDEX_COMPRESSION,
+        rerank_factor=config.INDEX_RERANK_FACTOR,
+        pq_m=config.INDEX_PQ_M,
+        dedup=config.INDEX_DEDUP,
+        dedup_threshold=config.INDEX_DEDUP_THRESHOLD,
+        dedup_embedding_threshold=config.INDEX_DEDUP_EMBEDDING_THRESHOLD,
+    )
+
+def set_faiss_index(faiss_index):
+    """
+    Replace the FAISS index used for retrieval.
+    Cached ticket embeddings are dropped if the new index uses a different model.
+
+    Args:
+        faiss_index (FAISSIndex | None): The new index; None rebuilds the default index on next use.
+
+    Returns:
+        FAISSIndex | None: The previous index.
+    """
+    global _faiss_index
+    with _faiss_index_lock:
+        previous, _faiss_index = _faiss_index, faiss_index
+    if previous is None or faiss_index is None or previous.get_model() is not faiss_index.get_model():
+        with _embedding_cache_lock:
+            _embedding_cache.clear()
+    return previous
+
+# Number of recent ticket embeddings kept in memory
+EMBEDDING_CACHE_SIZE = 1024
+
+def embed_tickets(tickets: list, model=None):
+    """
+    Embed a batch of tickets with the retriever's sentence transformer model.
+
+    Args:
+        tickets (list[str]): The ticket strings to embed.
+        model (SentenceTransformer): Model to use; defaults to the retriever's model.
+
+    Returns:
+        np.ndarray: Array of shape (len(tickets), dimension), dtype float32.
+    """
+    if model is None:
+        model = get_faiss_index().get_model()
+    if model is None:
+        raise RuntimeError("Embedding model is not initialized.")
+    with stage("embed"):
+        return model.encode(list(tickets), convert_to_numpy=True).astype('float32')
+
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+def _cache_embeddings(tickets: list, embeddings: np.ndarray):
+    """
+    Store ticket embeddings in the LRU cache, evicting the oldest entries beyond EMBEDDING_CACHE_SIZE.
+    """
+    with _embedding_cache_lock:
+        for ticket, embedding in zip(tickets, embeddings):
+            row = embedding.reshape(1, -1)
+            row.setflags(write=False)
+            _embedding_cache[ticket] = row
+            _embedding_cache.move_to_end(ticket)
+        while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+def embed_ticket(ticket: str, model=None):
+    """
+    Embed a single ticket.
+    Results are cached so retrieval and the action classifier share one encode per ticket.
+
+    Args:
+        ticket (str): The ticket string to embed.
+        model (SentenceTransformer): Model to use; defaults to the retriever's model.
+
+    Returns:
+        np.ndarray: Read-only array of shape (1, dimension), dtype float32.
+    """
+    with _embedding_cache_lock:
+        cached = _embedding_cache.get(ticket)
+        if cached is not None:
+            _embedding_cache.move_to_end(ticket)
+            return cached
+
+    ticket_emb = embed_tickets([ticket], model=model)
+    ticket_emb.setflags(write=False)
+    _cache_embeddings([ticket], ticket_emb)
+    return ticket_emb
 
 def retrieve_docs(ticket: str, top_k: int = 1):
     """
@@ -31,38 +179,114 @@ def retrieve_docs(ticket: str, top_k: int = 1):
         logger.warning("Empty or invalid ticket provided to retrieve_docs.")
         return []
     
-    if index is None or model is None:
+    faiss_index = get_faiss_index()
+    if faiss_index.get_index() is None or faiss_index.get_model() is None:
         logger.warning("FAISS index or model is not initialized.")
         return []
     
     try:
-        ticket_emb = model.encode([ticket], convert_to_numpy=True).astype('float32')
+        ticket_emb = embed_ticket(ticket, model=faiss_index.get_model())
     except Exception as e:
         logger.error(f"Error generating embedding for ticket: {e}")
         return []
     
-    # Adjust top_k if it exceeds the number of indexed documents
-    top_k = min(top_k, index.ntotal)
+    return search_docs(ticket_emb, top_k, faiss_index=faiss_index)[0]
 
-    distances, indices = index.search(ticket_emb, top_k)
+def search_docs(embeddings: np.ndarray, top_k: int = 1, faiss_index=None):
+    """
+    Search the FAISS index with precomputed ticket embeddings.
+
+    Args:
+        embeddings (np.ndarray): Ticket embeddings of shape (n, dimension).
+        top_k (int): Number of top relevant documents to retrieve per ticket.
+        faiss_index (FAISSIndex): Index to search; defaults to the retriever's index.
+
+    Returns:
+        List[List[dict]]: Relevant documents for each embedding, in input order.
+    """
+    faiss_index = faiss_index or get_faiss_index()
+    section_map = faiss_index.get_section_map()
+
+    with stage("search"):
+        distances, indices = faiss_index.search(embeddings, top_k)
 
     # Fetch corresponding documents
     results = []
-    for dist, idx in zip(distances[0], indices[0]):
-        if idx == -1:
-            continue
-
-        doc = section_map[idx]
-        results.append({
-            "policy": doc["policy"],
-            "section": doc["section"],
-            "title": doc["title"],
-            "text": doc["text"],
-            "distance": float(dist)
-        })
-    
+    for row_distances, row_indices in zip(distances, indices):
+        docs = []
+        for dist, idx in zip(row_distances, row_indices):
+            if idx == -1:
+                continue
+
+            doc = section_map[idx]
+            docs.append({
+                "policy": doc["policy"],
+                "section": doc["section"],
+                "title": doc["title"],
+                "text": doc["text"],
+                "distance": float(dist)
+            })
+            if "sources" in doc:
+                # Every (policy, section) a deduplicated section stands for
+                docs[-1]["sources"] = doc["sources"]
+        results.append(docs)
+
     return results
 
+def retrieve_docs_batch(tickets: list, top_k: int = 1):
+    """
+    Retrieve relevant documents for many tickets with one embedding call and one index search.
+
+    Args:
+        tickets (list[str]): The input ticket strings.
+        top_k (int): Number of top relevant documents to retrieve per ticket.
+
+    Returns:
+        List[List[dict]]: Relevant documents for each ticket, in input order.
+        Empty or invalid tickets get an empty list.
+    """
+    results = [[] for _ in tickets]
+    valid = [i for i, ticket in enumerate(tickets) if isinstance(ticket, str) and ticket.strip()]
+    if not valid:
+        return results
+
+    faiss_index = get_faiss_index()
+    if faiss_index.get_index() is None or faiss_index.get_model() is None:
+        logger.warning("FAISS index or model is not initialized.")
+        return results
+
+    try:
+        embeddings = embed_tickets([tickets[i] for i in valid], model=faiss_index.get_model())
+    except Exception as e:
+        logger.error(f"Error generating embeddings for ticket batch: {e}")
+        return results
+    _cache_embeddings([tickets[i] for i in valid], embeddings)
+
+    for i, docs in zip(valid, search_docs(embeddings, top_k, faiss_index=faiss_index)):
+        results[i] = docs
+    return results
+
+def warm_up():
+    """
+    Build the index and run one embedding and search, so the first ticket does not pay
+    model loading and lazy initialization costs.
+
+    Returns:
+        bool: True if the index and model are ready to serve.
+    """
+    global _faiss_index
+    # A failed build stays cached so requests do not retry it; warm-up retries are the place to rebuild
+    with _faiss_index_lock:
+        if _faiss_index is not None and not index_ready(_faiss_index):
+            _faiss_index = None
+    faiss_index = get_faiss_index()
+    if not index_ready(faiss_index):
+        logger.warning("Warm-up failed: FAISS index or model is not initialized.")
+        return False
+    embeddings = embed_tickets(["warm-up ticket"], model=faiss_index.get_model())
+    search_docs(embeddings, top_k=1, faiss_index=faiss_index)
+    return True
+
 # Test usage
 if __name__ == "__main__":
     
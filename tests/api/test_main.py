@@ -47,4 +47,89 @@ def test_resolve_ticket_llm_exception():
         data = response.json()
         assert data["answer"].startswith("Error")
         assert data["references"] == []
-        assert data["action_required"] == "none"
\ No newline at end of file
+        assert data["action_required"] == "none"
+
+def test_resolve_ticket_server_timing_header():
+    payload = {"ticket_text": "What is the refund policy?"}
+    sample_docs = [{"policy": "Policy A", "section": "1.1", "title": "Title A", "text": "Sample text."}]
+    mock_llm_response = '{"answer": "Sample.", "references": ["Policy A"], "action_required": "none"}'
+
+    with patch('src.llm.pipeline.retrieve_docs', return_value=sample_docs):
+        with patch('src.llm.pipeline.call_llm', return_value=mock_llm_response):
+            response = client.post("/resolve-ticket", json=payload)
+    assert response.status_code == 200
+    server_timing = response.headers["Server-Timing"]
+    for stage_name in ("build_prompt", "call_llm", "extract_json", "total"):
+        assert f"{stage_name};dur=" in server_timing
+
+def test_metrics_endpoint():
+    sample_docs = [{"policy": "Policy A", "section": "1.1", "title": "Title A", "text": "Sample text."}]
+    with patch('src.llm.pipeline.retrieve_docs', return_value=sample_docs):
+        with patch('src.llm.pipeline.call_llm', return_value="not json"):
+            client.post("/resolve-ticket", json={"ticket_text": "What is the refund policy?"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'rag_stage_duration_seconds_count{stage="call_llm"}' in response.text
+    assert "rag_parse_failures_total" in response.text
+
+def test_metrics_endpoint_disabled():
+    with patch('src.config.METRICS_ENABLED', False):
+        response = client.get("/metrics")
+    assert response.status_code == 404
+
+def test_ready_endpoint_reports_warm_state():
+    from src.api.main import warmup
+    with patch.dict(warmup.status, {"embedding": True, "llm": False}):
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["components"] == {"embedding": True, "llm": False}
+    with patch.dict(warmup.status, {"embedding": True, "llm": True}):
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+def test_ready_endpoint_without_warmup():
+    with patch('src.config.WARMUP_ENABLED', False):
+        response = client.get("/ready")
+    assert response.status_code == 200
+
+def test_reload_policies_endpoint():
+    with patch('src.api.main.reloader.request_reload') as mock_reload:
+        response = client.post("/admin/reload-policies")
+    assert response.status_code == 202
+    assert response.json()["status"] == "reload_scheduled"
+    mock_reload.assert_called_once()
+
+def test_reload_policies_endpoint_requires_token():
+    with patch('src.config.ADMIN_TOKEN', "secret"):
+        with patch('src.api.main.reloader.request_reload') as mock_reload:
+            assert client.post("/admin/reload-policies").status_code == 403
+            response = client.post("/admin/reload-policies", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 202
+    mock_reload.assert_called_once()
+
+def test_resolve_ticket_audit_record(tmp_path):
+    import json
+    from src.audit import AuditLog
+    sample_docs = [{"policy": "Refund Policy", "section": "1.2", "title": "Refunds", "text": "Refunds take 5 days.", "distance": 0.1}]
+    llm_output = '{"answer": "Refunds take 5 days.", "references": ["Policy: Refund Policy, Section 1.2"], "action_required": "none"}'
+    audit_log = AuditLog(backend="jsonl", path=str(tmp_path / "audit.jsonl"))
+
+    with patch('src.config.AUDIT_ENABLED', True), patch('src.api.main.audit_log', audit_log):
+        with patch('src.llm.pipeline.retrieve_docs', return_value=sample_docs):
+            with patch('src.llm.pipeline.call_llm', return_value=llm_output):
+                response = client.post("/resolve-ticket", json={"ticket_text": "Where is my refund?"},
+                                       headers={"X-Request-ID": "audit-1"})
+    assert response.status_code == 200
+    audit_log.stop()
+
+    record = json.loads((tmp_path / "audit.jsonl").read_text().splitlines()[0])
+    assert record["request_id"] == "audit-1"
+    assert record["ticket"] == "Where is my refund?"
+    assert record["sections"] == [{"policy": "Refund Policy", "section": "1.2", "distance": 0.1}]
+    assert record["served_by"] == "llm"
+    assert record["llm_output"] == llm_output
+    assert record["response"]["answer"] == "Refunds take 5 days."
+    assert "total" in record["timings"]
@@ -0,0 +1,113 @@
+# Unit tests for API profiling module
+
+import pytest
+import json
+import time
+import threading
+from unittest.mock import patch
+from src.api.profiling import should_profile, profile_request, write_profile, SamplingProfiler
+from src.api.main import app
+from fastapi.testclient import TestClient
+
+client = TestClient(app)
+
+def busy_work(seconds=0.05):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+def test_should_profile_disabled_by_default():
+    with patch("src.config.PROFILING_ENABLED", False):
+        assert should_profile(requested=True) is False
+
+def test_should_profile_requested_or_sampled():
+    with patch("src.config.PROFILING_ENABLED", True):
+        with patch("src.config.PROFILING_SAMPLE_RATE", 0.0):
+            assert should_profile(requested=True) is True
+            assert should_profile(requested=False) is False
+        with patch("src.config.PROFILING_SAMPLE_RATE", 1.0):
+            assert should_profile(requested=False) is True
+
+def test_profile_request_not_enabled():
+    with profile_request(False) as profiler:
+        assert profiler is None
+
+def test_profile_request_one_at_a_time():
+    with profile_request(True) as outer:
+        assert outer is not None
+        results = []
+        thread = threading.Thread(target=lambda: results.append(profile_request(True).__enter__()))
+        thread.start()
+        thread.join()
+        assert results == [None]
+    # Lock is released afterwards
+    with profile_request(True) as profiler:
+        assert profiler is not None
+
+def test_sampling_profiler_collects_stacks(tmp_path):
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001)
+    profiler.start()
+    busy_work()
+    profiler.stop()
+    assert sum(profiler.samples.values()) > 0
+    assert any("busy_work" in stack for stack in profiler.samples)
+
+def test_write_profile_sampling(tmp_path):
+    with patch("src.config.PROFILING_DIR", str(tmp_path)):
+        with patch("src.config.PROFILING_MODE", "sampling"):
+            with profile_request(True) as profiler:
+                busy_work()
+        path = write_profile(profiler, "req/1", {"call_llm": 0.05})
+
+    assert path.suffix == ".folded"
+    assert "_req_1_" in path.name
+    metadata = json.loads(path.with_suffix(".json").read_text())
+    assert metadata["request_id"] == "req/1"
+    assert metadata["mode"] == "sampling"
+    assert metadata["stage_timings_ms"] == {"call_llm": 50.0}
+
+def test_write_profile_deterministic(tmp_path):
+    with patch("src.config.PROFILING_DIR", str(tmp_path)):
+        with patch("src.config.PROFILING_MODE", "deterministic"):
+            with profile_request(True) as profiler:
+                busy_work(0.01)
+        path = write_profile(profiler, "abc", {})
+
+    assert path.suffix == ".prof"
+    import pstats
+    assert pstats.Stats(str(path)).total_calls > 0
+
+def test_write_profile_same_request_id_does_not_overwrite(tmp_path):
+    with patch("src.config.PROFILING_DIR", str(tmp_path)):
+        with patch("src.config.PROFILING_MODE", "sampling"):
+            paths = []
+            for _ in range(2):
+                with profile_request(True) as profiler:
+                    busy_work(0.01)
+                paths.append(write_profile(profiler, "same-id", {}))
+
+    assert paths[0] != paths[1]
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+def test_resolve_ticket_profiled_on_header(tmp_path):
+    sample_docs = [{"policy": "Policy A", "section": "1.1", "title": "Title A", "text": "Sample text."}]
+    mock_llm_response = '{"answer": "Sample.", "references": ["Policy A"], "action_required": "none"}'
+
+    with patch("src.config.PROFILING_ENABLED", True), patch("src.config.PROFILING_DIR", str(tmp_path)):
+        with patch('src.llm.pipeline.retrieve_docs', return_value=sample_docs):
+            with patch('src.llm.pipeline.call_llm', return_value=mock_llm_response):
+                response = client.post(
+                    "/resolve-ticket",
+                    json={"ticket_text": "What is the refund policy?"},
+                    headers={"X-Profile": "1", "X-Request-ID": "ticket-42"},
+                )
+                unprofiled = client.post("/resolve-ticket", json={"ticket_text": "What is the refund policy?"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "ticket-42"
+    assert unprofiled.headers["X-Request-ID"]
+    metadata_files = list(tmp_path.glob("*.json"))
+    assert len(metadata_files) == 1
+    metadata = json.loads(metadata_files[0].read_text())
+    assert metadata["request_id"] == "ticket-42"
+    assert "call_llm" in metadata["stage_timings_ms"]
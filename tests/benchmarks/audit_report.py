@@ -0,0 +1,131 @@
+# tests/benchmarks/audit_report.py
+
+# Audit log overhead report
+# Measures what the audit log adds to the request path: the cost of one record() call,
+# compared with writing the record synchronously, and /resolve-ticket latency percentiles
+# under open-loop load with the audit log off, on SQLite and on JSONL.
+#
+# Usage:
+#   python -m tests.benchmarks.audit_report --rate 200 --duration 10 --output audit.json
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import numpy as np
+
+from tests.corpus import sample_tickets
+from tests.benchmarks.loadtest import in_process_app, run_open_loop
+
+SAMPLE_RECORD = {
+    "request_id": "benchmark",
+    "ticket": "My refund has not arrived yet, what should I do?",
+    "sections": [{"policy": "Refund Policy", "section": "1.2", "distance": 0.42}],
+    "served_by": "llm",
+    "llm_output": "{\"answer\": \"Refunds take 5-7 business days.\"}" * 4,
+    "response": {"answer": "Refunds take 5-7 business days.", "references": [], "action_required": "none"},
+}
+
+def _percentiles_us(samples: list):
+    p50, p99, p999 = np.percentile(np.array(samples) * 1e6, [50, 99, 99.9])
+    return {"p50_us": round(float(p50), 2), "p99_us": round(float(p99), 2), "p999_us": round(float(p999), 2)}
+
+def measure_record_call(backend: str, workdir: str, n: int = 20000):
+    """
+    Latency of AuditLog.record() from the caller's side, against a synchronous write of one record.
+
+    Returns:
+        dict: Percentiles of both, plus records written and dropped.
+    """
+    from src.audit import AuditLog, open_writer
+
+    path = os.path.join(workdir, f"record_{backend}.{'db' if backend == 'sqlite' else 'jsonl'}")
+    audit_log = AuditLog(backend=backend, path=path)
+    audit_log.start()
+    queued = []
+    for i in range(n):
+        start = time.perf_counter()
+        audit_log.record(dict(SAMPLE_RECORD, request_id=str(i)))
+        queued.append(time.perf_counter() - start)
+    audit_log.stop()
+
+    writer = open_writer(backend, path + ".sync")
+    synchronous = []
+    for i in range(min(n, 2000)):
+        start = time.perf_counter()
+        writer.write([dict(SAMPLE_RECORD, request_id=str(i), timestamp=time.time())])
+        synchronous.append(time.perf_counter() - start)
+    writer.close()
+
+    return {
+        "backend": backend,
+        "record": _percentiles_us(queued),
+        "synchronous_write": _percentiles_us(synchronous),
+        "written": audit_log.written,
+        "dropped": audit_log.dropped,
+    }
+
+async def _load_step(rate: float, duration: float, sections: int, audit_backend: str, workdir: str):
+    import httpx
+    from src.audit import AuditLog
+
+    with ExitStack() as stack:
+        transport = in_process_app(stack, sections, "0", 0.0)
+        audit_log = None
+        if audit_backend:
+            path = os.path.join(workdir, f"load_{audit_backend}.{'db' if audit_backend == 'sqlite' else 'jsonl'}")
+            audit_log = AuditLog(backend=audit_backend, path=path)
+            stack.enter_context(patch("src.config.AUDIT_ENABLED", True))
+            stack.enter_context(patch("src.api.main.audit_log", audit_log))
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(transport=transport, base_url="http://audit", limits=limits) as client:
+            stats = await run_open_loop(client, rate, duration, sample_tickets(1000))
+        if audit_log is not None:
+            audit_log.stop()
+            stats.update({"written": audit_log.written, "dropped": audit_log.dropped})
+    stats["audit"] = audit_backend or "off"
+    return stats
+
+def run_report(rate: float = 200, duration: float = 10, sections: int = 1000, record_calls: int = 20000):
+    """
+    Run the record() micro-benchmark and one load step per audit setting.
+
+    Returns:
+        dict: "record_call" and "load" results.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        record_call = [measure_record_call(backend, workdir, record_calls) for backend in ("sqlite", "jsonl")]
+        load = [asyncio.run(_load_step(rate, duration, sections, backend, workdir))
+                for backend in (None, "sqlite", "jsonl")]
+    return {"record_call": record_call, "load": load}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the request-path overhead of the audit log.")
+    parser.add_argument("--rate", type=float, default=200, help="Open-loop arrival rate in requests/s.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per load step.")
+    parser.add_argument("--sections", type=int, default=1000, help="Synthetic corpus size.")
+    parser.add_argument("--record-calls", type=int, default=20000, help="record() calls in the micro-benchmark.")
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    report = run_report(args.rate, args.duration, args.sections, args.record_calls)
+    for result in report["record_call"]:
+        print(f"{result['backend']:6s} record() p50 {result['record']['p50_us']:8.2f} us  p99 {result['record']['p99_us']:8.2f} us"
+              f"  | synchronous write p50 {result['synchronous_write']['p50_us']:8.2f} us"
+              f"  p99 {result['synchronous_write']['p99_us']:8.2f} us  (dropped {result['dropped']})")
+    for stats in report["load"]:
+        print(f"audit {stats['audit']:6s} rate {stats['load']:g}  throughput {stats['throughput_rps']:8.2f} req/s  "
+              f"p50 {stats['p50_ms']} ms  p99 {stats['p99_ms']} ms  errors {stats['error_rate']:.2%}"
+              + (f"  written {stats['written']} dropped {stats['dropped']}" if "written" in stats else ""))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# tests/benchmarks/compression_report.py
+
+# Embedding compression report for the policy index
+# Builds the index with each vector storage option (float32, fp16, sq8, PQ, with and without
+# re-ranking) and reports index size, build time, search latency and recall@k against float32.
+#
+# Usage:
+#   python -m tests.benchmarks.compression_report --sections 10000 --top-k 3 --output compression.json
+#   python -m tests.benchmarks.compression_report --policy-dir ./data/raw_docs --model all-MiniLM-L6-v2
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from tests.corpus import sample_tickets
+from tests.benchmarks.reports import report_corpus
+from tests.benchmarks.run_benchmarks import measure
+
+# (label, compression, rerank_factor)
+CONFIGURATIONS = [
+    ("flat", "flat", 0),
+    ("fp16", "fp16", 0),
+    ("sq8", "sq8", 0),
+    ("sq8+rerank", "sq8", 4),
+    ("pq", "pq", 0),
+    ("pq+rerank", "pq", 10),
+]
+
+def index_bytes(faiss_index):
+    """
+    Size of the serialized FAISS index in bytes, i.e. what it occupies in memory.
+    Memory-mapped re-ranking vectors are not included.
+    """
+    import faiss
+
+    return int(len(faiss.serialize_index(faiss_index.get_index())))
+
+def recall_at_k(indices: np.ndarray, exact: np.ndarray):
+    """
+    Fraction of the exact top-k results that were also returned, averaged over queries.
+    """
+    hits = [len(set(row[row >= 0]) & set(truth[truth >= 0])) / max(1, (truth >= 0).sum())
+            for row, truth in zip(indices, exact)]
+    return float(np.mean(hits))
+
+def run_report(policy_dir: str, encoder, queries: list, top_k: int = 3, iterations: int = 20,
+               configurations=CONFIGURATIONS, pq_m: int = 0):
+    """
+    Build one index per configuration and compare it with the float32 index.
+
+    Args:
+        policy_dir (str): Directory of policy files to index.
+        encoder: Embedding model with a SentenceTransformer-compatible encode method.
+        queries (list[str]): Ticket texts used as search queries.
+        top_k (int): Results per query.
+        iterations (int): Timed search calls per configuration.
+        configurations (list[tuple]): (label, compression, rerank_factor) triples.
+        pq_m (int): PQ subquantizers; 0 picks automatically.
+    Returns:
+        list[dict]: One result per configuration.
+    """
+    from src.index.faiss_index import FAISSIndex
+
+    query_embeddings = np.asarray(encoder.encode(queries, convert_to_numpy=True), dtype="float32")
+    results = []
+    exact = None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Fill the embedding cache once so build times measure index construction, not encoding
+        FAISSIndex(policy_dir, model=encoder, cache_dir=cache_dir)
+        for label, compression, rerank_factor in configurations:
+            started = time.perf_counter()
+            faiss_index = FAISSIndex(policy_dir, model=encoder, cache_dir=cache_dir,
+                                     compression=compression, rerank_factor=rerank_factor, pq_m=pq_m)
+            build_seconds = time.perf_counter() - started
+
+            _, indices = faiss_index.search(query_embeddings, top_k)
+            if exact is None:
+                flat = faiss_index if compression == "flat" else FAISSIndex(policy_dir, model=encoder, cache_dir=cache_dir)
+                exact = flat.search(query_embeddings, top_k)[1]
+                flat_bytes = index_bytes(flat)
+
+            size = index_bytes(faiss_index)
+            latency = measure(lambda i: faiss_index.search(query_embeddings[i % len(query_embeddings)][None, :], top_k),
+                              iterations)
+            results.append({
+                "name": label,
+                "compression": compression,
+                "rerank_factor": rerank_factor,
+                "vectors": faiss_index.get_index().ntotal,
+                "index_bytes": size,
+                "size_ratio": round(flat_bytes / size, 2) if size else None,
+                "build_seconds": build_seconds,
+                "search_p50_seconds": latency["p50_seconds"],
+                "search_p95_seconds": latency["p95_seconds"],
+                f"recall_at_{top_k}": recall_at_k(indices, exact),
+            })
+    return results
+
+def _format_row(result: dict, top_k: int):
+    return (
+        f"{result['name']:12s} {result['index_bytes'] / 1e6:10.2f} MB  x{result['size_ratio']:<6g} "
+        f"build {result['build_seconds'] * 1000:9.1f} ms  search p50 {result['search_p50_seconds'] * 1000:8.3f} ms  "
+        f"recall@{top_k} {result[f'recall_at_{top_k}']:.3f}"
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare embedding compression options for the policy index.")
+    parser.add_argument("--sections", type=int, default=10000, help="Synthetic corpus size (ignored with --policy-dir).")
+    parser.add_argument("--policy-dir", help="Index these policy files instead of a synthetic corpus.")
+    parser.add_argument("--model", help="SentenceTransformer model name (default: the hashing encoder).")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sample tickets used as queries.")
+    parser.add_argument("--top-k", type=int, default=3, help="Results per query.")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed single-query searches per configuration.")
+    parser.add_argument("--pq-m", type=int, default=0, help="PQ subquantizers (bytes per vector); 0 picks automatically.")
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    with report_corpus(args.policy_dir, args.model, args.sections) as (policy_dir, encoder):
+        results = run_report(policy_dir, encoder, sample_tickets(args.queries), args.top_k, args.iterations,
+                             pq_m=args.pq_m)
+
+    for result in results:
+        print(_format_row(result, args.top_k))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"top_k": args.top_k, "results": results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
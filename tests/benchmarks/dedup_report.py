@@ -0,0 +1,107 @@
+# tests/benchmarks/dedup_report.py
+
+# Section deduplication report for the policy index
+# Builds the index with and without near-duplicate collapsing on a corpus with repeated
+# boilerplate, and reports section count, index size, build time and how many top_k
+# results repeat a text already returned for the same query.
+#
+# Usage:
+#   python -m tests.benchmarks.dedup_report --sections 10000 --boilerplate 0.2 --output dedup.json
+#   python -m tests.benchmarks.dedup_report --policy-dir ./data/raw_docs --model all-MiniLM-L6-v2
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from src.ingest.dedup import normalize_text
+from tests.benchmarks.compression_report import index_bytes
+from tests.corpus import sample_tickets
+from tests.benchmarks.reports import report_corpus
+
+def redundant_results(faiss_index, query_embeddings: np.ndarray, top_k: int):
+    """
+    Average number of results per query whose normalized text repeats an earlier result.
+    """
+    section_map = faiss_index.get_section_map()
+    _, indices = faiss_index.search(query_embeddings, top_k)
+    repeats = []
+    for row in indices:
+        texts = [normalize_text(section_map[i]["text"]) for i in row if i >= 0]
+        repeats.append(len(texts) - len(set(texts)))
+    return float(np.mean(repeats))
+
+def run_report(policy_dir: str, encoder, queries: list, top_k: int = 5, threshold: float = 0.8,
+               embedding_threshold: float = 0.95):
+    """
+    Build the index without and with deduplication and compare them.
+
+    Args:
+        policy_dir (str): Directory of policy files to index.
+        encoder: Embedding model with a SentenceTransformer-compatible encode method.
+        queries (list[str]): Ticket texts used as search queries.
+        top_k (int): Results per query.
+        threshold (float): Jaccard threshold for near duplicates.
+        embedding_threshold (float): Cosine threshold for near duplicates.
+    Returns:
+        list[dict]: One result per build.
+    """
+    from src.index.faiss_index import FAISSIndex
+
+    query_embeddings = np.asarray(encoder.encode(queries, convert_to_numpy=True), dtype="float32")
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Fill the embedding cache once so build times measure ingestion and indexing, not encoding
+        FAISSIndex(policy_dir, model=encoder, cache_dir=cache_dir)
+        for dedup in (False, True):
+            started = time.perf_counter()
+            faiss_index = FAISSIndex(policy_dir, model=encoder, cache_dir=cache_dir, dedup=dedup,
+                                     dedup_threshold=threshold, dedup_embedding_threshold=embedding_threshold)
+            build_seconds = time.perf_counter() - started
+            results.append({
+                "name": "dedup" if dedup else "baseline",
+                "sections": len(faiss_index.sections) if not dedup else
+                            sum(len(section["sources"]) for section in faiss_index.sections),
+                "indexed": faiss_index.get_index().ntotal,
+                "index_bytes": index_bytes(faiss_index),
+                "build_seconds": build_seconds,
+                f"redundant_in_top_{top_k}": redundant_results(faiss_index, query_embeddings, top_k),
+            })
+    baseline, deduped = results
+    deduped["size_reduction"] = round(1 - deduped["index_bytes"] / baseline["index_bytes"], 4)
+    deduped["build_overhead_seconds"] = deduped["build_seconds"] - baseline["build_seconds"]
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure near-duplicate section collapsing in the policy index.")
+    parser.add_argument("--sections", type=int, default=10000, help="Synthetic corpus size (ignored with --policy-dir).")
+    parser.add_argument("--boilerplate", type=float, default=0.2,
+                        help="Fraction of synthetic sections that repeat a boilerplate paragraph.")
+    parser.add_argument("--policy-dir", help="Index these policy files instead of a synthetic corpus.")
+    parser.add_argument("--model", help="SentenceTransformer model name (default: the hashing encoder).")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sample tickets used as queries.")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per query.")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard threshold for near duplicates.")
+    parser.add_argument("--embedding-threshold", type=float, default=0.95, help="Cosine threshold for near duplicates.")
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    with report_corpus(args.policy_dir, args.model, args.sections, args.boilerplate) as (policy_dir, encoder):
+        results = run_report(policy_dir, encoder, sample_tickets(args.queries), args.top_k,
+                             args.threshold, args.embedding_threshold)
+
+    for result in results:
+        print(f"{result['name']:10s} sections {result['sections']:8d}  indexed {result['indexed']:8d}  "
+              f"{result['index_bytes'] / 1e6:8.2f} MB  build {result['build_seconds'] * 1000:9.1f} ms  "
+              f"redundant in top {args.top_k} {result[f'redundant_in_top_{args.top_k}']:.2f}")
+    deduped = results[-1]
+    print(f"index size reduction {deduped['size_reduction']:.1%}, build overhead {deduped['build_overhead_seconds'] * 1000:.1f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"top_k": args.top_k, "results": results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
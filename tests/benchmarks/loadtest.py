@@ -0,0 +1,214 @@
+# tests/benchmarks/loadtest.py
+
+# Load-testing harness for the /resolve-ticket API
+# Drives the endpoint at increasing load and reports throughput, latency percentiles and errors per step.
+#
+# Against a running server (start it with the fake LLM so results reflect the service, not Ollama):
+#   LLM_BACKEND=fake FAKE_LLM_LATENCY=lognormal:0.5,0.4 uvicorn src.api.main:app --workers 1
+#   python -m tests.benchmarks.loadtest --url http://localhost:8000 --mode open --load 5,10,20,40 --duration 30
+#
+# In-process, against a synthetic corpus with no model download:
+#   python -m tests.benchmarks.loadtest --in-process --mode closed --load 1,8,32,64 --llm-latency 0.2
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import numpy as np
+
+from tests.corpus import sample_tickets
+
+def summarize(latencies: list, errors: int, sent: int, duration: float, load):
+    """
+    Summarize one load step.
+
+    Args:
+        latencies (list[float]): Latencies of successful requests, in seconds.
+        errors (int): Number of failed requests.
+        sent (int): Number of requests sent.
+        duration (float): Length of the step in seconds.
+        load (float): Arrival rate (open loop) or concurrency (closed loop) of the step.
+    Returns:
+        dict: Step statistics; latencies in milliseconds.
+    """
+    completed = len(latencies) + errors
+    stats = {
+        "load": load,
+        "sent": sent,
+        "completed": completed,
+        "throughput_rps": round(len(latencies) / duration, 3) if duration > 0 else 0.0,
+        "error_rate": round(errors / completed, 4) if completed else 0.0,
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        stats.update({"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2)})
+    else:
+        stats.update({"p50_ms": None, "p95_ms": None, "p99_ms": None})
+    return stats
+
+async def _send(client, ticket: str, timeout: float):
+    """
+    Send one ticket. Returns True on success; errors include transport failures,
+    non-200 statuses and pipeline error answers.
+    """
+    try:
+        response = await client.post("/resolve-ticket", json={"ticket_text": ticket}, timeout=timeout)
+    except Exception:
+        return False
+    if response.status_code != 200:
+        return False
+    return not response.json().get("answer", "").startswith("Error")
+
+async def run_closed_loop(client, concurrency: int, duration: float, tickets: list, timeout: float = 60.0):
+    """
+    Keep concurrency requests in flight for duration seconds; each worker sends its next
+    request as soon as the previous one completes.
+    """
+    latencies, counters = [], {"errors": 0, "sent": 0}
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id):
+        i = worker_id
+        while time.perf_counter() < deadline:
+            counters["sent"] += 1
+            start = time.perf_counter()
+            ok = await _send(client, tickets[i % len(tickets)], timeout)
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                counters["errors"] += 1
+            i += concurrency
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return summarize(latencies, counters["errors"], counters["sent"], time.perf_counter() - start, concurrency)
+
+async def run_open_loop(client, rate: float, duration: float, tickets: list, timeout: float = 60.0, seed: int = 0):
+    """
+    Send requests with Poisson arrivals at rate per second for duration seconds, regardless of
+    how many are still in flight. Latency is measured from each request's scheduled send time,
+    so queueing delay in the client or server is not hidden (no coordinated omission).
+    """
+    rng = random.Random(seed)
+    latencies, counters = [], {"errors": 0}
+    tasks = []
+
+    async def request(ticket, scheduled):
+        ok = await _send(client, ticket, timeout)
+        if ok:
+            latencies.append(time.perf_counter() - scheduled)
+        else:
+            counters["errors"] += 1
+
+    start = time.perf_counter()
+    next_arrival = start
+    i = 0
+    while next_arrival < start + duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(tickets[i % len(tickets)], next_arrival)))
+        i += 1
+        next_arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+    # Throughput over the offered window plus drain time
+    return summarize(latencies, counters["errors"], len(tasks), time.perf_counter() - start, rate)
+
+async def run_ramp(client, mode: str, loads: list, duration: float, tickets: list, timeout: float = 60.0):
+    """
+    Run one step per load level and return their statistics.
+    """
+    steps = []
+    for load in loads:
+        if mode == "open":
+            stats = await run_open_loop(client, load, duration, tickets, timeout)
+        else:
+            stats = await run_closed_loop(client, int(load), duration, tickets, timeout)
+        steps.append(stats)
+        print(_format_step(mode, stats), flush=True)
+    return steps
+
+def _format_step(mode: str, stats: dict):
+    label = "rate" if mode == "open" else "concurrency"
+    fmt = lambda v: f"{v:9.1f}" if v is not None else "        -"
+    return (
+        f"{label} {stats['load']:>7g}  throughput {stats['throughput_rps']:8.2f} req/s  "
+        f"p50 {fmt(stats['p50_ms'])} ms  p95 {fmt(stats['p95_ms'])} ms  p99 {fmt(stats['p99_ms'])} ms  "
+        f"errors {stats['error_rate']:.2%}"
+    )
+
+def in_process_app(stack: ExitStack, n_sections: int, llm_latency: str, llm_failure_rate: float):
+    """
+    Prepare the API in this process with a synthetic corpus and the fake LLM backend.
+    Patches are registered on stack and undone when it closes.
+    """
+    import httpx
+    from src.index.faiss_index import FAISSIndex
+    from tests.corpus import generate_policies, HashEncoder
+    from tests.benchmarks.run_benchmarks import use_index
+
+    policy_dir = stack.enter_context(tempfile.TemporaryDirectory())
+    generate_policies(policy_dir, n_sections)
+    stack.enter_context(use_index(FAISSIndex(policy_dir, model=HashEncoder())))
+    stack.enter_context(patch("src.config.LLM_BACKEND", "fake"))
+    stack.enter_context(patch("src.config.FAKE_LLM_LATENCY", llm_latency))
+    stack.enter_context(patch("src.config.FAKE_LLM_FAILURE_RATE", llm_failure_rate))
+
+    from src.api.main import app
+    return httpx.ASGITransport(app=app)
+
+async def _main_async(args):
+    import httpx
+
+    tickets = sample_tickets(1000)
+    loads = [float(load) for load in args.load.split(",") if load.strip()]
+
+    with ExitStack() as stack:
+        if args.in_process:
+            transport = in_process_app(stack, args.sections, args.llm_latency, args.llm_failure_rate)
+            base_url = "http://loadtest"
+            if args.threadpool_size:
+                # Size of the threadpool that runs sync endpoints, normally set by the server
+                import anyio.to_thread
+                anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool_size
+        else:
+            transport, base_url = None, args.url
+
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits) as client:
+            return await run_ramp(client, args.mode, loads, args.duration, tickets, args.timeout)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the /resolve-ticket endpoint.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running API server.")
+    target.add_argument("--in-process", action="store_true",
+                        help="Serve the app in this process with a synthetic corpus and the fake LLM.")
+    parser.add_argument("--mode", choices=("open", "closed"), default="closed",
+                        help="open: Poisson arrivals at each rate; closed: fixed number of concurrent clients.")
+    parser.add_argument("--load", default="1,4,16,64",
+                        help="Comma-separated load steps: requests/s (open) or concurrency (closed).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per load step.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--output", help="Write step statistics to this JSON file.")
+    in_process = parser.add_argument_group("in-process options")
+    in_process.add_argument("--sections", type=int, default=1000, help="Synthetic corpus size.")
+    in_process.add_argument("--llm-latency", default="lognormal:0.5,0.4",
+                            help="Fake LLM latency distribution, see src/llm/fake_llm.py.")
+    in_process.add_argument("--llm-failure-rate", type=float, default=0.0, help="Fraction of fake LLM calls that fail.")
+    in_process.add_argument("--threadpool-size", type=int, help="Threads available to sync endpoints (default 40).")
+    args = parser.parse_args(argv)
+
+    steps = asyncio.run(_main_async(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mode": args.mode, "duration": args.duration, "steps": steps}, f, indent=2)
+    return steps
+
+if __name__ == "__main__":
+    main()
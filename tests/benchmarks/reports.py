@@ -0,0 +1,36 @@
+# tests/benchmarks/reports.py
+
+# Shared setup for the index reports
+# Loads the embedding model and provides the policy corpus the compression and dedup reports run on.
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from tests.corpus import generate_policies, HashEncoder
+
+@contextmanager
+def report_corpus(policy_dir: str = None, model: str = None, sections: int = 10000, boilerplate: float = 0.0):
+    """
+    Embedding model and policy directory for a report, generating a temporary synthetic corpus
+    when no policy directory is given.
+
+    Args:
+        policy_dir (str): Index these policy files instead of a synthetic corpus.
+        model (str): SentenceTransformer model name; the hashing encoder when not set.
+        sections (int): Synthetic corpus size.
+        boilerplate (float): Fraction of synthetic sections that repeat a boilerplate paragraph.
+    Yields:
+        tuple[str, object]: The policy directory and the encoder.
+    """
+    if model:
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer(model)
+    else:
+        encoder = HashEncoder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not policy_dir:
+            policy_dir = os.path.join(tmp, "corpus")
+            generate_policies(policy_dir, sections, boilerplate=boilerplate)
+        yield policy_dir, encoder
@@ -0,0 +1,292 @@
+# tests/benchmarks/run_benchmarks.py
+
+# Performance benchmarks for the RAG system
+# Measures ingestion, indexing, retrieval, prompt building, parsing and end-to-end
+# /resolve-ticket latency on synthetic corpora, with a deterministic fake LLM.
+# Results are written as JSON and checked against regression thresholds.
+#
+# Usage:
+#   python -m tests.benchmarks.run_benchmarks --scales 21,1000,10000 --output bench_results.json
+#   python -m tests.benchmarks.run_benchmarks --scales 1000000 --iterations 5
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from tests.corpus import generate_policies, sample_tickets, HashEncoder
+
+DEFAULT_THRESHOLDS = str(Path(__file__).with_name("thresholds.json"))
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+
+# Dependencies that must not be imported until the service actually needs them
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "faiss", "sklearn")
+
+SAMPLE_LLM_RESPONSE = """
+Here is the analysis of the ticket:
+{
+    "answer": "Refunds are processed within 5-7 business days after the cancellation is approved.",
+    "references": ["Policy: Refund Policy, Section 1.2"],
+    "action_required": "none"
+}
+"""
+
+def measure(fn, iterations: int, warmup: int = 1):
+    """
+    Time repeated calls to fn.
+
+    Args:
+        fn (callable): Function to time; called with the iteration number.
+        iterations (int): Number of timed calls.
+        warmup (int): Untimed calls made first.
+    Returns:
+        dict: Timing statistics in seconds.
+    """
+    for i in range(warmup):
+        fn(-1 - i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples)
+    return {
+        "iterations": iterations,
+        "min_seconds": float(samples.min()),
+        "mean_seconds": float(samples.mean()),
+        "p50_seconds": float(np.percentile(samples, 50)),
+        "p95_seconds": float(np.percentile(samples, 95)),
+    }
+
+@contextmanager
+def use_index(faiss_index):
+    """
+    Point the retriever at a benchmark index for the duration of the block.
+    """
+    from src.rag import retriever
+
+    previous = retriever.set_faiss_index(faiss_index)
+    try:
+        yield retriever
+    finally:
+        retriever.set_faiss_index(previous)
+
+def run_scale(n_sections: int, workdir: str, iterations: int, encoder):
+    """
+    Run the corpus-dependent benchmarks at one corpus size.
+
+    Returns:
+        list[dict]: One result per benchmark.
+    """
+    from src.ingest.loader import load_policies
+    from src.index.faiss_index import FAISSIndex
+    from src.llm.fake_llm import FakeLLM
+
+    policy_dir = os.path.join(workdir, f"corpus_{n_sections}")
+    generate_policies(policy_dir, n_sections)
+
+    # Rebuilding large corpora dominates the run, so time them fewer times
+    build_iterations = 3 if n_sections <= 10000 else 1
+    results = []
+
+    def record(name, stats):
+        results.append({"name": name, "scale": n_sections, **stats})
+
+    record("load_policies", measure(lambda i: load_policies(policy_dir), build_iterations, warmup=0))
+    record("faiss_build", measure(lambda i: FAISSIndex(policy_dir, model=encoder), build_iterations, warmup=0))
+
+    faiss_index = FAISSIndex(policy_dir, model=encoder)
+    tickets = sample_tickets(iterations + 1 + 64 * (iterations + 1))
+
+    with use_index(faiss_index) as retriever:
+        # Distinct tickets per call so the embedding cache never hits
+        record("retrieve_docs", measure(lambda i: retriever.retrieve_docs(tickets[i], top_k=3), iterations))
+        batches = [tickets[k:k + 64] for k in range(0, len(tickets), 64)]
+        record("retrieve_docs_batch_64", measure(lambda i: retriever.retrieve_docs_batch(batches[i], top_k=3), iterations))
+
+        from fastapi.testclient import TestClient
+        from src.api.main import app
+
+        client = TestClient(app)
+        with patch("src.llm.pipeline.call_llm", FakeLLM()):
+            def resolve(i):
+                response = client.post("/resolve-ticket", json={"ticket_text": tickets[i]})
+                assert response.status_code == 200
+            record("resolve_ticket", measure(resolve, iterations))
+
+    return results
+
+def measure_import(module: str, repeats: int = 3):
+    """
+    Measure the cold import time of a module in fresh interpreters with python -X importtime.
+
+    Args:
+        module (str): Module to import, e.g. "src.api.main".
+        repeats (int): Number of fresh interpreters to time.
+    Returns:
+        dict: Timing statistics in seconds, plus the heavy modules the import pulled in.
+    """
+    code = f"import sys, json, {module}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    pattern = re.compile(rf"^import time:\s+\d+ \|\s+(\d+) \|\s*{re.escape(module)}$", re.MULTILINE)
+    samples, heavy = [], []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        match = pattern.search(result.stderr)
+        samples.append(int(match.group(1)) / 1e6 if match else float("nan"))
+        heavy = json.loads(result.stdout.strip().splitlines()[-1])
+    samples = np.array(samples)
+    return {
+        "iterations": repeats,
+        "min_seconds": float(samples.min()),
+        "mean_seconds": float(samples.mean()),
+        "p50_seconds": float(np.percentile(samples, 50)),
+        "p95_seconds": float(np.percentile(samples, 95)),
+        "heavy_modules": heavy,
+    }
+
+def run_static(iterations: int):
+    """
+    Run the benchmarks that do not depend on corpus size.
+
+    Returns:
+        list[dict]: One result per benchmark.
+    """
+    from src.llm.pipeline import build_prompt, extract_json
+
+    docs = [
+        {"policy": f"Policy {i}", "section": f"{i}.1", "title": f"Title {i}", "text": "Sample policy text. " * 20}
+        for i in range(3)
+    ]
+    repeat = max(iterations * 10, 100)
+    results = []
+    for name, fn in (
+        ("build_prompt", lambda i: build_prompt("My refund has not arrived yet.", docs)),
+        ("extract_json", lambda i: extract_json(SAMPLE_LLM_RESPONSE)),
+    ):
+        results.append({"name": name, "scale": None, **measure(fn, repeat)})
+    results.append({"name": "import_api", "scale": None, **measure_import("src.api.main")})
+    return results
+
+def run_suite(scales: list, iterations: int = 20, workdir: str = None):
+    """
+    Run every benchmark.
+
+    Args:
+        scales (list[int]): Corpus sizes, in sections.
+        iterations (int): Timed iterations for per-request benchmarks.
+        workdir (str): Where to generate corpora; a temporary directory if omitted.
+    Returns:
+        list[dict]: Benchmark results.
+    """
+    encoder = HashEncoder()
+    results = run_static(iterations)
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for n_sections in scales:
+            results.extend(run_scale(n_sections, tmp, iterations, encoder))
+    return results
+
+def _key(result: dict):
+    return result["name"] if result["scale"] is None else f"{result['name']}@{result['scale']}"
+
+def check_thresholds(results: list, thresholds: dict):
+    """
+    Compare p50 latencies against absolute limits.
+
+    Args:
+        results (list[dict]): Benchmark results.
+        thresholds (dict): Maps "name" or "name@scale" to the maximum allowed p50 in seconds.
+    Returns:
+        list[str]: Descriptions of benchmarks over their limit.
+    """
+    failures = []
+    for result in results:
+        if result.get("heavy_modules"):
+            failures.append(f"{_key(result)}: imports heavy dependencies eagerly: {', '.join(result['heavy_modules'])}")
+        limit = thresholds.get(_key(result))
+        if limit is not None and result["p50_seconds"] > limit:
+            failures.append(f"{_key(result)}: p50 {result['p50_seconds']:.6f}s exceeds threshold {limit:.6f}s")
+    return failures
+
+def compare_baseline(results: list, baseline: list, max_regression: float):
+    """
+    Compare p50 latencies against an earlier run.
+
+    Args:
+        results (list[dict]): Benchmark results.
+        baseline (list[dict]): Results of an earlier run.
+        max_regression (float): Allowed relative slowdown, e.g. 0.25 for 25%.
+    Returns:
+        list[str]: Descriptions of benchmarks that regressed.
+    """
+    previous = {_key(result): result["p50_seconds"] for result in baseline}
+    failures = []
+    for result in results:
+        before = previous.get(_key(result))
+        if before and result["p50_seconds"] > before * (1 + max_regression):
+            failures.append(
+                f"{_key(result)}: p50 {result['p50_seconds']:.6f}s is "
+                f"{result['p50_seconds'] / before - 1:.0%} slower than baseline {before:.6f}s"
+            )
+    return failures
+
+def environment():
+    import faiss
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "faiss": getattr(faiss, "__version__", "unknown"),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the RAG performance benchmarks.")
+    parser.add_argument("--scales", default="21,1000,10000",
+                        help="Comma-separated corpus sizes in sections (up to 1000000).")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed iterations per benchmark.")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write results as JSON.")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS,
+                        help="JSON file of maximum p50 latencies; pass an empty string to skip.")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.5,
+                        help="Allowed relative p50 slowdown against --baseline.")
+    parser.add_argument("--workdir", help="Directory for generated corpora (default: system temp).")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+    results = run_suite(scales, args.iterations, args.workdir)
+
+    failures = []
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            failures += check_thresholds(results, json.load(f))
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += compare_baseline(results, json.load(f)["results"], args.max_regression)
+
+    report = {"environment": environment(), "results": results, "failures": failures}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        print(f"{_key(result):40s} p50 {result['p50_seconds'] * 1000:10.3f} ms  p95 {result['p95_seconds'] * 1000:10.3f} ms")
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
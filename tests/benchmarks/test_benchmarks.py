@@ -0,0 +1,109 @@
+# Unit tests for the benchmark suite
+# Runs the suite on a tiny corpus to keep it working; timings themselves are not asserted here
+
+import pytest
+import json
+import numpy as np
+from tests.corpus import generate_policies, sample_tickets, HashEncoder
+from tests.benchmarks.run_benchmarks import run_suite, check_thresholds, compare_baseline, measure_import, main, DEFAULT_THRESHOLDS
+from src.ingest.loader import load_policies
+
+def test_generate_policies_scale(tmp_path):
+    assert generate_policies(str(tmp_path), 10, sections_per_policy=4) == 10
+    sections = load_policies(str(tmp_path))
+    assert len(sections) == 10
+    assert len(list(tmp_path.glob("*.json"))) == 3
+
+def test_generate_policies_deterministic(tmp_path):
+    generate_policies(str(tmp_path / "a"), 8)
+    generate_policies(str(tmp_path / "b"), 8)
+    assert load_policies(str(tmp_path / "a")) == load_policies(str(tmp_path / "b"))
+
+def test_hash_encoder():
+    encoder = HashEncoder(dimension=32)
+    embeddings = encoder.encode(sample_tickets(5))
+    assert embeddings.shape == (5, 32)
+    assert embeddings.dtype == np.float32
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+    assert np.array_equal(embeddings, encoder.encode(sample_tickets(5)))
+
+def test_run_suite_small():
+    results = run_suite([21], iterations=2)
+    names = {result["name"] for result in results}
+    assert names == {
+        "build_prompt", "extract_json", "load_policies", "faiss_build",
+        "retrieve_docs", "retrieve_docs_batch_64", "resolve_ticket", "import_api",
+    }
+    for result in results:
+        assert result["p50_seconds"] >= 0
+        assert result["p95_seconds"] >= result["min_seconds"]
+
+def test_check_thresholds():
+    results = [
+        {"name": "retrieve_docs", "scale": 21, "p50_seconds": 0.002},
+        {"name": "build_prompt", "scale": None, "p50_seconds": 0.0001},
+    ]
+    assert check_thresholds(results, {"retrieve_docs@21": 0.01, "build_prompt": 0.001}) == []
+    failures = check_thresholds(results, {"retrieve_docs@21": 0.001})
+    assert len(failures) == 1
+    assert failures[0].startswith("retrieve_docs@21")
+
+def test_check_thresholds_heavy_imports():
+    results = [{"name": "import_api", "scale": None, "p50_seconds": 0.1, "heavy_modules": ["torch"]}]
+    failures = check_thresholds(results, {})
+    assert len(failures) == 1
+    assert "torch" in failures[0]
+
+def test_api_import_is_lightweight():
+    # Importing the API must not load torch, sentence_transformers, faiss or sklearn
+    result = measure_import("src.api.main", repeats=1)
+    assert result["heavy_modules"] == []
+    assert result["p50_seconds"] > 0
+
+def test_compare_baseline():
+    baseline = [{"name": "extract_json", "scale": None, "p50_seconds": 0.001}]
+    assert compare_baseline([{"name": "extract_json", "scale": None, "p50_seconds": 0.0012}], baseline, 0.5) == []
+    assert len(compare_baseline([{"name": "extract_json", "scale": None, "p50_seconds": 0.002}], baseline, 0.5)) == 1
+
+def test_main_fails_on_regression(tmp_path):
+    thresholds = tmp_path / "thresholds.json"
+    thresholds.write_text(json.dumps({"build_prompt": 0.0}))
+    output = tmp_path / "results.json"
+
+    assert main(["--scales", "21", "--iterations", "2", "--output", str(output), "--thresholds", str(thresholds)]) == 1
+    report = json.loads(output.read_text())
+    assert report["failures"]
+    assert report["results"]
+
+def test_default_thresholds_valid():
+    with open(DEFAULT_THRESHOLDS) as f:
+        thresholds = json.load(f)
+    assert all(isinstance(limit, float) and limit > 0 for limit in thresholds.values())
+
+def test_compression_report_small(tmp_path):
+    from tests.benchmarks.compression_report import run_report
+
+    generate_policies(str(tmp_path), 300)
+    results = run_report(str(tmp_path), HashEncoder(dimension=64), sample_tickets(20), top_k=3, iterations=2)
+    by_name = {result["name"]: result for result in results}
+    assert by_name["flat"]["recall_at_3"] == 1.0
+    assert by_name["sq8"]["index_bytes"] < by_name["flat"]["index_bytes"]
+    assert by_name["pq+rerank"]["recall_at_3"] >= by_name["pq"]["recall_at_3"]
+
+def test_dedup_report_small(tmp_path):
+    from tests.benchmarks.dedup_report import run_report
+
+    generate_policies(str(tmp_path), 200, boilerplate=0.3)
+    baseline, deduped = run_report(str(tmp_path), HashEncoder(dimension=64), sample_tickets(10), top_k=5)
+    assert baseline["sections"] == deduped["sections"] == 200
+    assert deduped["indexed"] < baseline["indexed"]
+    assert deduped["size_reduction"] > 0
+    assert deduped["redundant_in_top_5"] == 0
+
+def test_audit_record_call_benchmark(tmp_path):
+    from tests.benchmarks.audit_report import measure_record_call
+
+    result = measure_record_call("jsonl", str(tmp_path), n=200)
+    assert result["written"] + result["dropped"] == 200
+    assert result["record"]["p50_us"] > 0
+    assert result["synchronous_write"]["p99_us"] >= result["synchronous_write"]["p50_us"]
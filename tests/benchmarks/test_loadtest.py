@@ -0,0 +1,43 @@
+# Unit tests for the load-testing harness
+
+import pytest
+import asyncio
+import httpx
+from contextlib import ExitStack
+from tests.benchmarks.loadtest import summarize, run_ramp, in_process_app
+from tests.corpus import sample_tickets
+
+def test_summarize():
+    stats = summarize([0.1, 0.2, 0.3, 0.4], errors=1, sent=6, duration=2.0, load=4)
+    assert stats["load"] == 4
+    assert stats["completed"] == 5
+    assert stats["throughput_rps"] == 2.0
+    assert stats["error_rate"] == 0.2
+    assert stats["p50_ms"] == 250.0
+    assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= 400.0
+
+def test_summarize_no_successes():
+    stats = summarize([], errors=3, sent=3, duration=1.0, load=1)
+    assert stats["error_rate"] == 1.0
+    assert stats["p99_ms"] is None
+
+def run_in_process(mode, loads, failure_rate=0.0):
+    async def run():
+        with ExitStack() as stack:
+            transport = in_process_app(stack, 21, "0.01", failure_rate)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                return await run_ramp(client, mode, loads, 0.5, sample_tickets(50))
+    return asyncio.run(run())
+
+def test_closed_loop_in_process():
+    steps = run_in_process("closed", [1, 4])
+    assert [step["load"] for step in steps] == [1, 4]
+    for step in steps:
+        assert step["completed"] > 0
+        assert step["error_rate"] == 0.0
+        assert step["p50_ms"] >= 10.0
+
+def test_open_loop_in_process_counts_errors():
+    steps = run_in_process("open", [20], failure_rate=1.0)
+    assert steps[0]["sent"] > 0
+    assert steps[0]["error_rate"] == 1.0
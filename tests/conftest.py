@@ -0,0 +1,44 @@
+# Shared fixtures for unit tests
+
+import numpy as np
+import pytest
+
+class KeywordEncoder:
+    """
+    Embedding model stand-in: one dimension per keyword counting its occurrences in the
+    lowercased text, plus a constant dimension. Counts encode calls so tests can check reuse.
+    """
+    def __init__(self, keywords=("refund", "password", "domain")):
+        self.keywords = keywords
+        self.calls = 0
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.calls += 1
+        return np.array([[t.lower().count(k) for k in self.keywords] + [1.0] for t in texts], dtype="float32")
+
+@pytest.fixture
+def keyword_encoder():
+    return KeywordEncoder()
+
+@pytest.fixture
+def use_faiss_index():
+    """
+    Install FAISS indexes in the retriever for the test; the index in place before the
+    first install is restored afterwards, even if the test fails.
+
+    Yields:
+        callable: Takes a FAISSIndex (or None) to install and returns it.
+    """
+    from src.rag import retriever
+
+    previous = []
+
+    def install(faiss_index):
+        replaced = retriever.set_faiss_index(faiss_index)
+        if not previous:
+            previous.append(replaced)
+        return faiss_index
+
+    yield install
+    if previous:
+        retriever.set_faiss_index(previous[0])
@@ -0,0 +1,97 @@
+# tests/corpus.py
+
+# Synthetic policy corpus and embedding model shared by unit tests and benchmarks
+# Generates policy JSON files in the data/raw_docs format at any scale
+
+import json
+import zlib
+import numpy as np
+from pathlib import Path
+
+TOPICS = ["domain", "refund", "password", "billing", "verification", "transfer", "renewal", "dns", "email", "hosting"]
+VERBS = ["suspended", "processed", "reset", "charged", "verified", "transferred", "renewed", "updated", "locked", "cancelled"]
+OBJECTS = ["account", "order", "invoice", "payment method", "contact details", "WHOIS record", "reset link", "subscription"]
+# Repeated paragraphs of real policy exports; variants differ in case, punctuation or the year
+BOILERPLATE = [
+    "If you have any questions about this policy or need further assistance, please contact our customer "
+    "support team by email or phone. Our agents are available around the clock and will respond to your "
+    "request as quickly as possible. This policy was last updated in {year}.",
+    "This document is provided for informational purposes only and does not constitute legal advice. The "
+    "company reserves the right to modify these terms at any time without prior notice. Continued use of "
+    "the service after changes are published means you accept the revised terms as of {year}.",
+]
+
+def generate_policies(policy_dir: str, n_sections: int, sections_per_policy: int = 4, seed: int = 0,
+                      boilerplate: float = 0.0):
+    """
+    Write synthetic policy files to policy_dir.
+
+    Args:
+        policy_dir (str): Output directory, created if missing.
+        n_sections (int): Total number of sections to generate.
+        sections_per_policy (int): Sections per policy file.
+        seed (int): Random seed; the same seed always produces the same corpus.
+        boilerplate (float): Fraction of sections that repeat a BOILERPLATE paragraph.
+    Returns:
+        int: Number of sections written.
+    """
+    rng = np.random.default_rng(seed)
+    directory = Path(policy_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    n_policies = -(-n_sections // sections_per_policy)
+    written = 0
+    for p in range(n_policies):
+        topic = TOPICS[p % len(TOPICS)]
+        sections = []
+        for s in range(min(sections_per_policy, n_sections - written)):
+            words = [
+                f"The {OBJECTS[rng.integers(len(OBJECTS))]} is {VERBS[rng.integers(len(VERBS))]}"
+                f" when the {topic} {OBJECTS[rng.integers(len(OBJECTS))]} changes"
+                for _ in range(3)
+            ]
+            text = ". ".join(words) + f". Reference {p}-{s}."
+            if boilerplate and rng.random() < boilerplate:
+                text = BOILERPLATE[rng.integers(len(BOILERPLATE))].format(year=2020 + rng.integers(3))
+                if rng.random() < 0.5:
+                    text = text.upper().replace(".", "!")
+            sections.append({
+                "section": f"{p + 1}.{s + 1}",
+                "title": f"{topic.title()} rule {s + 1}",
+                "text": text
+            })
+            written += 1
+        with open(directory / f"policy_{p:07d}.json", "w") as f:
+            json.dump({"policy": f"Synthetic {topic.title()} Policy {p}", "sections": sections}, f)
+    return written
+
+def sample_tickets(n: int, seed: int = 1):
+    """
+    Generate synthetic ticket texts.
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        f"My {OBJECTS[rng.integers(len(OBJECTS))]} was {VERBS[rng.integers(len(VERBS))]}, "
+        f"what happens to my {TOPICS[rng.integers(len(TOPICS))]}? (ticket {i})"
+        for i in range(n)
+    ]
+
+class HashEncoder:
+    """
+    Deterministic bag-of-words encoder with the SentenceTransformer encode interface.
+    Hashes each word into one of dimension buckets, so tests and benchmarks measure indexing
+    and search rather than model inference, and run without downloading a model.
+    """
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        embeddings = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                embeddings[row, zlib.crc32(word.encode()) % self.dimension] += 1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
@@ -2,6 +2,7 @@
 
 import pytest
 from src.index.faiss_index import FAISSIndex
+from tests.corpus import HashEncoder, generate_policies, sample_tickets
 import json
 
 def test_faiss_index_creation(tmp_path):
@@ -82,4 +83,116 @@ def test_embedding_dimensions(tmp_path):
     embedding = model.encode([sample_text], convert_to_numpy=True).astype('float32')
 
     assert embedding.shape[0] == 1
-    assert embedding.shape[1] == index.d
\ No newline at end of file
+    assert embedding.shape[1] == index.d
+
+def test_injected_model(tmp_path, keyword_encoder):
+    policy_data = {
+        "policy": "Injected Policy",
+        "sections": [
+            {"section": "1.1", "title": "Section 1", "text": "Short text."},
+            {"section": "1.2", "title": "Section 2", "text": "A somewhat longer text for section two."}
+        ]
+    }
+    with open(tmp_path/"injected_policy.json", "w") as f:
+        json.dump(policy_data, f)
+
+    index_instance = FAISSIndex(policy_dir=str(tmp_path), model=keyword_encoder)
+    assert index_instance.get_model() is keyword_encoder
+    assert index_instance.get_index().ntotal == 2
+    assert index_instance.get_index().d == len(keyword_encoder.keywords) + 1
+
+def test_embedding_cache(tmp_path, keyword_encoder):
+    import numpy as np
+
+    policy_dir = tmp_path / "policies"
+    policy_dir.mkdir()
+    policy_data = {
+        "policy": "Cached Policy",
+        "sections": [{"section": "1.1", "title": "Section 1", "text": "Some cached text."}]
+    }
+    with open(policy_dir/"cached_policy.json", "w") as f:
+        json.dump(policy_data, f)
+    cache_dir = tmp_path / "cache"
+
+    first = FAISSIndex(policy_dir=str(policy_dir), model=keyword_encoder, cache_dir=str(cache_dir))
+    second = FAISSIndex(policy_dir=str(policy_dir), model=keyword_encoder, cache_dir=str(cache_dir))
+    assert keyword_encoder.calls == 1
+    assert len(list(cache_dir.glob("*.npy"))) == 1
+    assert np.array_equal(first.embeddings, second.embeddings)
+    assert second.get_index().ntotal == 1
+
+    # Changing the documents invalidates the cache
+    policy_data["sections"][0]["text"] = "Updated text."
+    with open(policy_dir/"cached_policy.json", "w") as f:
+        json.dump(policy_data, f)
+    FAISSIndex(policy_dir=str(policy_dir), model=keyword_encoder, cache_dir=str(cache_dir))
+    assert keyword_encoder.calls == 2
+
+def test_compressed_index_sizes(tmp_path):
+    import faiss
+
+    generate_policies(str(tmp_path), 300)
+    encoder = HashEncoder(dimension=64)
+    sizes = {}
+    for compression in ("flat", "fp16", "sq8", "pq"):
+        index_instance = FAISSIndex(policy_dir=str(tmp_path), model=encoder, compression=compression)
+        assert index_instance.get_index().ntotal == 300
+        sizes[compression] = len(faiss.serialize_index(index_instance.get_index()))
+    assert sizes["flat"] > sizes["fp16"] > sizes["sq8"]
+    # Without re-ranking the float32 copy is not kept
+    assert index_instance.embeddings is None
+
+def test_compression_rerank_matches_exact(tmp_path):
+    import numpy as np
+
+    policy_dir = tmp_path / "policies"
+    generate_policies(str(policy_dir), 300)
+    encoder = HashEncoder(dimension=64)
+    cache_dir = str(tmp_path / "cache")
+    flat = FAISSIndex(policy_dir=str(policy_dir), model=encoder, cache_dir=cache_dir)
+    reranked = FAISSIndex(policy_dir=str(policy_dir), model=encoder, cache_dir=cache_dir,
+                          compression="pq", rerank_factor=300)
+    # Full-precision vectors are memory-mapped from the embedding cache
+    assert isinstance(reranked.embeddings, np.memmap)
+
+    queries = encoder.encode(sample_tickets(10))
+    exact_distances, _ = flat.search(queries, 3)
+    distances, indices = reranked.search(queries, 3)
+    assert indices.shape == (10, 3)
+    # Re-ranking every vector gives exact distances
+    assert np.allclose(distances, exact_distances, atol=1e-5)
+
+def test_pq_falls_back_on_tiny_corpus(tmp_path):
+    generate_policies(str(tmp_path), 4)
+    index_instance = FAISSIndex(policy_dir=str(tmp_path), model=HashEncoder(dimension=16), compression="pq")
+    assert index_instance.get_index().ntotal == 4
+    distances, indices = index_instance.search(HashEncoder(dimension=16).encode(["refund"]), 10)
+    assert indices.shape == (1, 4)
+
+def test_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        FAISSIndex(policy_dir=str(tmp_path), compression="zip")
+
+def test_dedup_collapses_boilerplate(tmp_path):
+    import numpy as np
+
+    policy_dir = tmp_path / "policies"
+    generate_policies(str(policy_dir), 200, boilerplate=0.3)
+    encoder = HashEncoder(dimension=64)
+    cache_dir = str(tmp_path / "cache")
+    full = FAISSIndex(policy_dir=str(policy_dir), model=encoder, cache_dir=cache_dir)
+    deduped = FAISSIndex(policy_dir=str(policy_dir), model=encoder, cache_dir=cache_dir, dedup=True)
+
+    assert deduped.get_index().ntotal < full.get_index().ntotal
+    assert len(deduped.get_section_map()) == deduped.get_index().ntotal
+    # Every original section is still referenced exactly once
+    sources = [(s["policy"], s["section"]) for section in deduped.sections for s in section["sources"]]
+    assert sorted(sources) == sorted((s["policy"], s["section"]) for s in full.sections)
+
+    # Re-ranking reads the right rows of the full embedding cache
+    reranked = FAISSIndex(policy_dir=str(policy_dir), model=encoder, cache_dir=cache_dir, dedup=True,
+                          compression="sq8", rerank_factor=1000)
+    queries = encoder.encode(sample_tickets(5))
+    exact_distances, exact_indices = deduped.search(queries, 3)
+    distances, indices = reranked.search(queries, 3)
+    assert np.allclose(distances, exact_distances, atol=1e-5)
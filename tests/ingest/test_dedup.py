@@ -0,0 +1,62 @@
+# Unit tests for near-duplicate section detection
+
+import pytest
+import numpy as np
+from src.ingest.dedup import normalize_text, shingles, MinHasher, lsh_candidates, deduplicate_sections
+
+FOOTER = ("If you have any questions about this policy please contact our support team by email or phone. "
+          "Our agents are available around the clock and respond as quickly as possible.")
+
+def make_section(policy, section, text):
+    return {"policy": policy, "section": section, "title": "Title", "text": text}
+
+def test_normalize_text():
+    assert normalize_text("  Hello,   WORLD!\n") == "hello world"
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = shingles(normalize_text(FOOTER))
+    b = shingles(normalize_text(FOOTER.replace("phone", "chat")))
+    c = shingles(normalize_text("Refunds are processed within five business days of approval."))
+    same = np.mean(hasher.signature(a) == hasher.signature(b))
+    different = np.mean(hasher.signature(a) == hasher.signature(c))
+    assert same > 0.7
+    assert different < 0.1
+
+def test_lsh_candidates_pairs_identical_signatures():
+    signatures = np.array([[1, 2, 3, 4], [1, 2, 3, 4], [5, 6, 7, 8]], dtype=np.uint64)
+    assert lsh_candidates(signatures, bands=2) == {(0, 1)}
+
+def test_deduplicate_exact_and_near():
+    sections = [
+        make_section("Refund Policy", "1.1", "Refunds are processed within 5-7 business days."),
+        make_section("Refund Policy", "9.9", FOOTER),
+        make_section("Domain Policy", "9.9", FOOTER.upper()),
+        make_section("Billing Policy", "9.9", FOOTER.replace("phone", "telephone")),
+        make_section("Domain Policy", "2.1", "Domains are suspended after repeated abuse reports."),
+    ]
+    canonical, keep = deduplicate_sections(sections)
+    assert keep == [0, 1, 4]
+    assert canonical[1]["text"] == FOOTER
+    assert canonical[1]["sources"] == [
+        {"policy": "Refund Policy", "section": "9.9"},
+        {"policy": "Domain Policy", "section": "9.9"},
+        {"policy": "Billing Policy", "section": "9.9"},
+    ]
+    assert canonical[0]["sources"] == [{"policy": "Refund Policy", "section": "1.1"}]
+    # The input is not modified
+    assert "sources" not in sections[1]
+
+def test_embedding_similarity_vetoes_near_duplicates():
+    sections = [make_section("A", "1", FOOTER), make_section("B", "1", FOOTER.replace("phone", "telephone"))]
+    orthogonal = np.array([[1.0, 0.0], [0.0, 1.0]], dtype="float32")
+    _, keep = deduplicate_sections(sections, orthogonal)
+    assert keep == [0, 1]
+    _, keep = deduplicate_sections(sections, np.ones((2, 2), dtype="float32"))
+    assert keep == [0]
+
+def test_deduplicate_no_duplicates():
+    sections = [make_section("A", "1", "First text about refunds."), make_section("B", "1", "Second text about domains.")]
+    canonical, keep = deduplicate_sections(sections)
+    assert keep == [0, 1]
+    assert [section["text"] for section in canonical] == [section["text"] for section in sections]
@@ -0,0 +1,136 @@
+# Unit tests for batch processing module
+
+import pytest
+import json
+from unittest.mock import patch
+from src.llm import batch
+from src.llm.batch import run_batch, count_lines, read_checkpoint
+
+# Helper to write tickets as JSONL
+def write_tickets(path, tickets):
+    with open(path, "w", encoding="utf-8") as f:
+        for ticket in tickets:
+            f.write((ticket if isinstance(ticket, str) else json.dumps(ticket)) + "\n")
+
+def read_output(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def fake_retrieve(tickets, top_k=1):
+    return [[{"policy": "Policy A", "section": "1.1", "title": "Title", "text": t}] for t in tickets]
+
+def fake_answer(ticket, docs):
+    return {"answer": f"Answer: {ticket}", "references": ["Policy A"], "action_required": "none"}
+
+@pytest.fixture
+def fake_pipeline():
+    with patch("src.llm.batch.retrieve_docs_batch", side_effect=fake_retrieve) as mock_retrieve:
+        with patch("src.llm.batch.answer_from_docs", side_effect=fake_answer):
+            yield mock_retrieve
+
+def test_count_lines(tmp_path):
+    path = tmp_path / "lines.jsonl"
+    path.write_text("a\nb\nc")
+    assert count_lines(str(path)) == 3
+    path.write_text("a\nb\n")
+    assert count_lines(str(path)) == 2
+
+def test_run_batch_writes_results_in_order(tmp_path, fake_pipeline):
+    input_path = tmp_path / "tickets.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_tickets(input_path, [{"ticket_text": f"Ticket {i}", "request_id": f"r{i}"} for i in range(10)])
+
+    stats = run_batch(str(input_path), str(output_path), workers=3, batch_size=4, id_field="request_id")
+
+    results = read_output(output_path)
+    assert [r["line"] for r in results] == list(range(1, 11))
+    assert [r["id"] for r in results] == [f"r{i}" for i in range(10)]
+    assert results[3]["answer"] == "Answer: Ticket 3"
+    assert stats["processed"] == 10
+    # Retrieval happens once per batch, not once per ticket
+    assert fake_pipeline.call_count == 3
+    assert read_checkpoint(str(output_path) + ".checkpoint")["processed"] == 10
+
+def test_run_batch_invalid_and_empty_records(tmp_path, fake_pipeline):
+    input_path = tmp_path / "tickets.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_tickets(input_path, [{"ticket_text": "Valid"}, "{ invalid json", {"ticket_text": ""}])
+
+    run_batch(str(input_path), str(output_path), batch_size=10)
+
+    results = read_output(output_path)
+    assert results[0]["answer"] == "Answer: Valid"
+    assert results[1]["answer"].startswith("Error")
+    assert results[2]["answer"].startswith("Error")
+
+def test_run_batch_multiple_text_fields(tmp_path, fake_pipeline):
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_tickets(input_path, [{"title": "Refund", "body": "Where is my refund?"}])
+
+    run_batch(str(input_path), str(output_path), text_fields=["title", "body"])
+
+    assert read_output(output_path)[0]["answer"] == "Answer: Refund\n\nWhere is my refund?"
+
+def test_run_batch_resumes_after_crash(tmp_path, fake_pipeline):
+    input_path = tmp_path / "tickets.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_tickets(input_path, [{"ticket_text": f"Ticket {i}"} for i in range(10)])
+
+    real_process_batch = batch.process_batch
+    calls = {"count": 0}
+
+    def crash_on_second_batch(*args, **kwargs):
+        calls["count"] += 1
+        if calls["count"] == 2:
+            raise RuntimeError("worker crashed")
+        return real_process_batch(*args, **kwargs)
+
+    with patch("src.llm.batch.process_batch", side_effect=crash_on_second_batch):
+        with pytest.raises(RuntimeError):
+            run_batch(str(input_path), str(output_path), batch_size=4)
+
+    assert read_checkpoint(str(output_path) + ".checkpoint")["processed"] == 4
+    # Simulate a partially written batch after the last checkpoint
+    with open(output_path, "a") as f:
+        f.write('{"line": 5, "answer": "partial')
+
+    stats = run_batch(str(input_path), str(output_path), batch_size=4)
+
+    results = read_output(output_path)
+    assert [r["line"] for r in results] == list(range(1, 11))
+    assert stats["resumed_from"] == 4
+
+def test_run_batch_no_resume_starts_over(tmp_path, fake_pipeline):
+    input_path = tmp_path / "tickets.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_tickets(input_path, [{"ticket_text": f"Ticket {i}"} for i in range(3)])
+
+    run_batch(str(input_path), str(output_path))
+    stats = run_batch(str(input_path), str(output_path), resume=False)
+
+    assert stats["resumed_from"] == 0
+    assert len(read_output(output_path)) == 3
+
+def test_run_batch_keeps_workers_busy_across_batches(tmp_path):
+    import threading
+    input_path = tmp_path / "tickets.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_tickets(input_path, [{"ticket_text": t} for t in ["slow", "fast 1", "fast 2", "fast 3"]])
+    next_batch_started = threading.Event()
+
+    def answer(ticket, docs):
+        if ticket == "slow":
+            # Only finishes if tickets of the next batch run while this one is in flight
+            assert next_batch_started.wait(5)
+        elif ticket in ("fast 2", "fast 3"):
+            next_batch_started.set()
+        return fake_answer(ticket, docs)
+
+    with patch("src.llm.batch.retrieve_docs_batch", side_effect=fake_retrieve):
+        with patch("src.llm.batch.answer_from_docs", side_effect=answer):
+            stats = run_batch(str(input_path), str(output_path), workers=2, batch_size=2)
+
+    results = read_output(output_path)
+    assert [r["answer"] for r in results] == ["Answer: slow", "Answer: fast 1", "Answer: fast 2", "Answer: fast 3"]
+    assert stats["processed"] == 4
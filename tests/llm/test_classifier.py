@@ -0,0 +1,135 @@
+# Unit tests for action classifier module
+
+import pytest
+import numpy as np
+from src.llm.classifier import ActionClassifier, get_action_classifier, load_labeled_tickets, MIN_CALIBRATION_PER_CLASS
+import json
+
+# Helper to build well-separated synthetic embeddings for each action
+def make_embeddings(n_per_class=20, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    actions = ["reset_password", "check_refund_status", "escalate_to_abuse_team"]
+    embeddings, labels = [], []
+    for i, action in enumerate(actions):
+        center = np.zeros(dim)
+        center[i] = 5.0
+        embeddings.append(center + rng.normal(scale=0.5, size=(n_per_class, dim)))
+        labels.extend([action] * n_per_class)
+    return np.vstack(embeddings).astype("float32"), labels
+
+def test_fit_and_predict():
+    embeddings, labels = make_embeddings()
+    classifier = ActionClassifier().fit(embeddings, labels)
+    actions, confidences = classifier.predict(embeddings)
+    assert len(actions) == len(labels)
+    assert sum(a == l for a, l in zip(actions, labels)) / len(labels) > 0.95
+    assert np.all((confidences > 0) & (confidences <= 1))
+    assert set(classifier.classes) == set(labels)
+
+def test_fit_requires_two_classes():
+    embeddings, _ = make_embeddings()
+    with pytest.raises(ValueError):
+        ActionClassifier().fit(embeddings, ["reset_password"] * len(embeddings))
+
+def test_predict_untrained():
+    with pytest.raises(RuntimeError):
+        ActionClassifier().predict(np.zeros((1, 8), dtype="float32"))
+
+def test_calibrate_meets_target_precision():
+    embeddings, labels = make_embeddings()
+    holdout, holdout_labels = make_embeddings(seed=1)
+    # Flip some held-out labels so not every prediction can be trusted
+    holdout_labels = list(holdout_labels)
+    for i in range(0, len(holdout_labels), 10):
+        holdout_labels[i] = "verify_identity"
+
+    classifier = ActionClassifier().fit(embeddings, labels)
+    threshold = classifier.calibrate(holdout, holdout_labels, target_precision=0.8)
+    report = classifier.evaluate(holdout, holdout_labels)
+
+    assert 0 < threshold <= 1
+    assert report["fast_path_fraction"] > 0
+    assert report["fast_path_accuracy"] >= 0.8
+
+def test_calibrate_unreachable_target():
+    embeddings, labels = make_embeddings()
+    classifier = ActionClassifier().fit(embeddings, labels)
+    wrong_labels = ["verify_identity"] * len(labels)
+    assert classifier.calibrate(embeddings, wrong_labels, target_precision=0.95) == 1.0
+
+def test_calibrate_too_few_tickets_per_class():
+    embeddings, labels = make_embeddings(n_per_class=4)
+    classifier = ActionClassifier().fit(embeddings, labels)
+    assert classifier.calibrate(embeddings, labels, target_precision=0.5) == 1.0
+    assert classifier.calibrate(embeddings, labels, target_precision=0.5, min_per_class=4) < 1.0
+
+def test_calibrate_out_of_fold_probabilities():
+    embeddings, labels = make_embeddings()
+    labels = list(labels)
+    for i in range(0, len(labels), 10):
+        labels[i] = "escalate_to_abuse_team"
+
+    classifier = ActionClassifier().fit(embeddings, labels)
+    probabilities = classifier.out_of_fold_probabilities(embeddings, labels, folds=5)
+    assert probabilities.shape == (len(labels), len(classifier.classes))
+    assert np.allclose(probabilities.sum(axis=1), 1.0)
+
+    classifier.calibrate(embeddings, labels, target_precision=0.8, probabilities=probabilities)
+    report = classifier.evaluate(embeddings, labels, probabilities=probabilities)
+    assert report["fast_path_fraction"] > 0
+    assert report["fast_path_accuracy"] >= 0.8
+
+def test_train_cli_saves_calibrated_model(tmp_path):
+    from unittest.mock import patch
+    from src.llm.classifier import main
+
+    embeddings, labels = make_embeddings()
+    data = tmp_path / "tickets.jsonl"
+    data.write_text("\n".join(json.dumps({"ticket_text": f"ticket {i}", "action_required": label})
+                              for i, label in enumerate(labels)))
+    model_out = tmp_path / "classifier.joblib"
+    with patch("src.rag.retriever.embed_tickets", return_value=embeddings):
+        main(["train", "--data", str(data), "--model-out", str(model_out), "--target-precision", "0.9"])
+
+    classifier = ActionClassifier.load(str(model_out))
+    assert classifier.threshold < 1.0
+    # The saved model is the one fitted on every ticket
+    assert len(classifier.model.coef_) == 3
+
+def test_save_and_load(tmp_path):
+    embeddings, labels = make_embeddings()
+    classifier = ActionClassifier(threshold=0.7).fit(embeddings, labels)
+    path = tmp_path / "models" / "classifier.joblib"
+    classifier.save(str(path))
+
+    loaded = ActionClassifier.load(str(path))
+    assert loaded.threshold == 0.7
+    assert loaded.predict(embeddings[:5])[0] == classifier.predict(embeddings[:5])[0]
+
+def test_get_action_classifier_disabled_or_missing(tmp_path):
+    assert get_action_classifier("") is None
+    assert get_action_classifier(str(tmp_path / "missing.joblib")) is None
+
+def test_load_labeled_tickets(tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    lines = [
+        json.dumps({"ticket_text": "Reset my password", "action_required": "reset_password"}),
+        "{ invalid json",
+        json.dumps({"ticket_text": "No label"}),
+        "",
+    ]
+    path.write_text("\n".join(lines))
+    texts, labels = load_labeled_tickets(str(path))
+    assert texts == ["Reset my password"]
+    assert labels == ["reset_password"]
+
+def test_load_sample_labeled_tickets():
+    texts, labels = load_labeled_tickets("./data/labeled_tickets.jsonl")
+    assert len(texts) == len(labels) > 0
+    assert len(set(labels)) > 1
+    # Enough tickets per action for train to calibrate a threshold with the defaults
+    assert min(labels.count(action) for action in set(labels)) >= MIN_CALIBRATION_PER_CLASS
+
+    holdout_texts, holdout_labels = load_labeled_tickets("./data/labeled_tickets_holdout.jsonl")
+    assert set(holdout_labels) == set(labels)
+    assert not set(holdout_texts) & set(texts)
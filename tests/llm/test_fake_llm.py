@@ -0,0 +1,56 @@
+# Unit tests for fake LLM module
+
+import pytest
+from src.llm.fake_llm import FakeLLM, fake_llm_response
+from src.llm.pipeline import build_prompt, extract_json
+
+def test_fake_llm_response_parses():
+    docs = [
+        {"policy": "Refund Policy", "section": "1.2", "title": "Refund Processing Time", "text": "Sample text."},
+        {"policy": "Billing & Payments Policy", "section": "3.3", "title": "Overdue Payments (Late)", "text": "More text."},
+    ]
+    response = extract_json(fake_llm_response(build_prompt("Where is my refund?", docs)))
+    assert response["references"] == [
+        "Policy: Refund Policy, Section 1.2",
+        "Policy: Billing & Payments Policy, Section 3.3",
+    ]
+    assert isinstance(response["answer"], str)
+    assert response["action_required"] == "none"
+
+def test_fake_llm_deterministic():
+    prompt = build_prompt("Ticket", [{"policy": "P", "section": "1", "title": "T", "text": "X"}])
+    fake = FakeLLM()
+    assert fake(prompt) == fake(prompt)
+    assert fake.calls == 2
+
+def test_parse_latency_specs():
+    import random
+    from src.llm.fake_llm import parse_latency
+    rng = random.Random(0)
+    assert parse_latency(0.25)(rng) == 0.25
+    assert parse_latency("0.5")(rng) == 0.5
+    assert parse_latency("fixed:0.1")(rng) == 0.1
+    assert 0.2 <= parse_latency("uniform:0.2,0.4")(rng) <= 0.4
+    assert parse_latency("normal:0.0,0.1")(rng) >= 0.0
+    assert parse_latency("lognormal:0.5,0.4")(rng) > 0
+    assert parse_latency("exponential:0.5")(rng) > 0
+
+def test_parse_latency_invalid():
+    from src.llm.fake_llm import parse_latency
+    for spec in ("uniform:0.1", "gamma:1,2", "fixed:abc", "lognormal:0,1"):
+        with pytest.raises(ValueError):
+            parse_latency(spec)
+
+def test_fake_llm_failure_rate():
+    fake = FakeLLM(failure_rate=1.0)
+    assert fake("prompt") == ""
+
+def test_call_llm_fake_backend():
+    from unittest.mock import patch
+    from src.llm.pipeline import call_llm
+    prompt = build_prompt("Ticket", [{"policy": "P", "section": "1", "title": "T", "text": "X"}])
+    with patch("src.config.LLM_BACKEND", "fake"):
+        with patch("subprocess.run") as mock_run:
+            response = call_llm(prompt)
+            mock_run.assert_not_called()
+    assert extract_json(response)["references"] == ["Policy: P, Section 1"]
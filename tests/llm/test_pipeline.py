@@ -1,7 +1,7 @@
 # Unit tests for pipeline module
 
 import pytest
-from src.llm.pipeline import build_prompt, generate_response, extract_json
+from src.llm.pipeline import build_prompt, generate_response, extract_json, ACTION_NEXT_STEPS
 from unittest.mock import patch
 
 def test_build_prompt_structure():
@@ -79,4 +79,55 @@ def test_generate_response_bad_llm_response():
             response = generate_response("Test query?", top_k=1)
             assert response["answer"].startswith("Error")
             assert response["references"] == []
-            assert response["action_required"] == "none"
\ No newline at end of file
+            assert response["action_required"] == "none"
+
+def test_generate_response_fast_path():
+    sample_docs = [
+        {"policy": "Password Reset Procedure", "section": "1.2", "title": "Expired Reset Link", "text": "Request a new reset link."}
+    ]
+
+    with patch('src.llm.pipeline.retrieve_docs', return_value=sample_docs):
+        with patch('src.llm.pipeline.get_action_classifier') as mock_get:
+            mock_get.return_value.predict.return_value = (["reset_password"], [0.97])
+            mock_get.return_value.threshold = 0.9
+            with patch('src.llm.pipeline.embed_ticket'):
+                with patch('src.llm.pipeline.call_llm') as mock_llm:
+                    response = generate_response("My reset link expired", top_k=1)
+                    mock_llm.assert_not_called()
+                    assert response["answer"].startswith(ACTION_NEXT_STEPS["reset_password"])
+                    assert "Password Reset Procedure, Section 1.2 (Expired Reset Link)" in response["answer"]
+                    assert response["references"] == ["Policy: Password Reset Procedure, Section 1.2"]
+                    assert response["action_required"] == "reset_password"
+
+def test_generate_response_fast_path_low_confidence():
+    sample_docs = [
+        {"policy": "Policy D", "section": "4.1", "title": "Title D", "text": "Sample text."}
+    ]
+    mock_llm_response = '{"answer": "From LLM.", "references": ["Policy D"], "action_required": "escalate"}'
+
+    with patch('src.llm.pipeline.retrieve_docs', return_value=sample_docs):
+        with patch('src.llm.pipeline.get_action_classifier') as mock_get:
+            mock_get.return_value.predict.return_value = (["reset_password"], [0.4])
+            mock_get.return_value.threshold = 0.9
+            with patch('src.llm.pipeline.embed_ticket'):
+                with patch('src.llm.pipeline.call_llm', return_value=mock_llm_response):
+                    response = generate_response("Something unusual", top_k=1)
+                    assert response["answer"] == "From LLM."
+                    assert response["action_required"] == "escalate"
+
+def test_generate_response_fast_path_unknown_action():
+    sample_docs = [
+        {"policy": "Policy D", "section": "4.1", "title": "Title D", "text": "Sample text."}
+    ]
+    mock_llm_response = '{"answer": "From LLM.", "references": ["Policy D"], "action_required": "escalate"}'
+
+    with patch('src.llm.pipeline.retrieve_docs', return_value=sample_docs):
+        with patch('src.llm.pipeline.get_action_classifier') as mock_get:
+            # Confident, but there is no templated answer for this action
+            mock_get.return_value.predict.return_value = (["transfer_domain"], [0.99])
+            mock_get.return_value.threshold = 0.9
+            with patch('src.llm.pipeline.embed_ticket'):
+                with patch('src.llm.pipeline.call_llm', return_value=mock_llm_response) as mock_llm:
+                    response = generate_response("Move my domain", top_k=1)
+                    mock_llm.assert_called_once()
+                    assert response["answer"] == "From LLM."
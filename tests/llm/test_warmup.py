@@ -0,0 +1,103 @@
+# Unit tests for warm-up module
+
+import pytest
+import json
+import time
+from unittest.mock import patch, MagicMock
+from src.llm.warmup import WarmupManager, preload_llm
+from src.llm import pipeline
+from src.rag import retriever
+
+def test_preload_llm_request():
+    response = MagicMock()
+    response.read.return_value = b'{"done": true}'
+    response.__enter__.return_value = response
+
+    with patch("src.config.OLLAMA_HOST", "127.0.0.1:11434"), patch("src.config.OLLAMA_KEEP_ALIVE", "45m"):
+        with patch("urllib.request.urlopen", return_value=response) as mock_urlopen:
+            assert preload_llm() is True
+
+    request = mock_urlopen.call_args[0][0]
+    assert request.full_url == "http://127.0.0.1:11434/api/generate"
+    assert json.loads(request.data) == {"model": pipeline.LLM_MODEL, "keep_alive": "45m"}
+
+def test_preload_llm_unreachable():
+    with patch("urllib.request.urlopen", side_effect=OSError("connection refused")):
+        assert preload_llm() is False
+
+def test_warmup_manager_ready():
+    manager = WarmupManager()
+    with patch("src.llm.warmup.retriever.warm_up", return_value=True), patch("src.llm.warmup.preload_llm", return_value=True):
+        manager.start()
+        manager._thread.join(timeout=0.5)
+        assert manager.ready
+        assert manager.status == {"embedding": True, "llm": True}
+        manager.stop()
+
+def test_warmup_manager_not_ready_when_llm_fails():
+    manager = WarmupManager()
+    with patch("src.llm.warmup.retriever.warm_up", return_value=True), patch("src.llm.warmup.preload_llm", return_value=False):
+        manager.warm_embedding()
+        manager.warm_llm()
+    assert manager.status == {"embedding": True, "llm": False}
+    assert not manager.ready
+
+def test_warmup_fake_backend_skips_llm():
+    manager = WarmupManager()
+    with patch("src.config.LLM_BACKEND", "fake"), patch("src.llm.warmup.preload_llm") as mock_preload:
+        assert manager.warm_llm() is True
+        mock_preload.assert_not_called()
+
+def test_warmup_embedding_error():
+    manager = WarmupManager()
+    with patch("src.llm.warmup.retriever.warm_up", side_effect=RuntimeError("no model")):
+        assert manager.warm_embedding() is False
+
+def test_refresh_if_idle():
+    manager = WarmupManager()
+    manager.status["llm"] = True
+    with patch("src.config.KEEP_ALIVE_INTERVAL", 60.0), patch("src.llm.warmup.preload_llm", return_value=True) as mock_preload:
+        # Recent LLM traffic keeps the model loaded, no refresh needed
+        with patch("src.llm.pipeline.last_llm_call", time.monotonic()):
+            manager._last_refresh = 0.0
+            assert manager.refresh_if_idle() is False
+        # Idle for longer than the interval
+        with patch("src.llm.pipeline.last_llm_call", time.monotonic() - 120):
+            manager._last_refresh = time.monotonic() - 120
+            assert manager.refresh_if_idle() is True
+        assert mock_preload.call_count == 1
+
+def test_failed_refresh_is_retried():
+    manager = WarmupManager()
+    with patch("src.config.KEEP_ALIVE_INTERVAL", 300.0):
+        with patch("src.llm.warmup.preload_llm", return_value=False):
+            assert manager.warm_llm() is False
+        assert manager._last_refresh == 0.0
+        # Recent LLM traffic does not stop a cold LLM from being reloaded
+        with patch("src.llm.pipeline.last_llm_call", time.monotonic()), \
+             patch("src.llm.warmup.preload_llm", return_value=True) as mock_preload:
+            assert manager.refresh_if_idle() is True
+            assert manager.status["llm"] is True
+            assert manager.refresh_if_idle() is False
+        mock_preload.assert_called_once()
+
+def test_failed_index_build_is_retried(tmp_path, monkeypatch, keyword_encoder, use_faiss_index):
+    from src.index.faiss_index import FAISSIndex
+
+    with open(tmp_path/"policy.json", "w") as f:
+        json.dump({"policy": "Warm Policy", "sections": [{"section": "1.1", "title": "Refunds", "text": "refund"}]}, f)
+    builds = []
+    def build(*args, **kwargs):
+        builds.append(len(builds))
+        # The first build fails and is left without an index or model, as when the model download fails
+        if len(builds) == 1:
+            return FAISSIndex(policy_dir=str(tmp_path / "missing"))
+        return FAISSIndex(policy_dir=str(tmp_path), model=keyword_encoder)
+    use_faiss_index(None)
+    monkeypatch.setattr(retriever, "build_faiss_index", build)
+
+    manager = WarmupManager()
+    assert manager.warm_embedding() is False
+    assert manager.warm_embedding() is True
+    assert builds == [0, 1]
+    assert retriever.retrieve_docs("refund", top_k=1)[0]["policy"] == "Warm Policy"
@@ -0,0 +1,126 @@
+# Unit tests for policy reloader module
+
+import pytest
+import json
+import os
+import time
+from src.index.faiss_index import FAISSIndex
+from src.rag import retriever
+from src.rag.reloader import PolicyReloader, policy_fingerprint
+
+def write_policy(policy_dir, sections, name="policy.json"):
+    with open(policy_dir / name, "w") as f:
+        json.dump({"policy": "Reloaded Policy", "sections": sections}, f)
+
+@pytest.fixture
+def policy_index(tmp_path, keyword_encoder, use_faiss_index):
+    write_policy(tmp_path, [{"section": "1.1", "title": "Refunds", "text": "refund refund"}])
+    use_faiss_index(FAISSIndex(policy_dir=str(tmp_path), model=keyword_encoder))
+    return tmp_path
+
+def test_policy_fingerprint_changes(tmp_path):
+    empty = policy_fingerprint(str(tmp_path))
+    write_policy(tmp_path, [{"section": "1.1", "title": "T", "text": "text"}])
+    first = policy_fingerprint(str(tmp_path))
+    assert first != empty
+    assert policy_fingerprint(str(tmp_path)) == first
+    write_policy(tmp_path, [{"section": "1.1", "title": "T", "text": "longer text"}])
+    assert policy_fingerprint(str(tmp_path)) != first
+
+def test_reload_swaps_index(policy_index, keyword_encoder):
+    old_snapshot = retriever.get_faiss_index()
+    write_policy(policy_index, [
+        {"section": "1.1", "title": "Refunds", "text": "refund refund"},
+        {"section": "1.2", "title": "Passwords", "text": "password password"},
+    ])
+
+    reloader = PolicyReloader(policy_dir=str(policy_index), interval=0)
+    assert reloader.reload() is True
+
+    new_snapshot = retriever.get_faiss_index()
+    assert new_snapshot is not old_snapshot
+    # The embedding model is reused, not reloaded
+    assert new_snapshot.get_model() is old_snapshot.get_model()
+    assert reloader.status["generation"] == 1
+    assert reloader.status["sections"] == 2
+    assert retriever.retrieve_docs("password help", top_k=1)[0]["section"] == "1.2"
+    # A request still holding the old snapshot keeps working against it
+    assert old_snapshot.get_index().ntotal == 1
+    docs = retriever.search_docs(keyword_encoder.encode(["password"]), top_k=2, faiss_index=old_snapshot)[0]
+    assert [d["section"] for d in docs] == ["1.1"]
+
+def test_reload_failure_keeps_current_index(policy_index):
+    current = retriever.get_faiss_index()
+    os.remove(policy_index / "policy.json")
+
+    reloader = PolicyReloader(policy_dir=str(policy_index), interval=0)
+    assert reloader.reload() is False
+    assert retriever.get_faiss_index() is current
+    assert reloader.status["last_error"]
+    # The failed state is remembered so the watcher does not rebuild again until files change
+    assert reloader.check_for_changes() is False
+
+def test_watcher_reloads_on_change(policy_index):
+    reloader = PolicyReloader(policy_dir=str(policy_index), interval=0.05)
+    reloader.start()
+    try:
+        write_policy(policy_index, [{"section": "2.1", "title": "Domains", "text": "domain domain"}], name="domains.json")
+        deadline = time.time() + 5
+        while reloader.status["generation"] == 0 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        reloader.stop()
+    assert reloader.status["generation"] >= 1
+    assert retriever.retrieve_docs("domain suspended", top_k=1)[0]["section"] == "2.1"
+
+def test_request_reload_runs_in_background(policy_index):
+    reloader = PolicyReloader(policy_dir=str(policy_index), interval=0)
+    reloader.request_reload()
+    try:
+        deadline = time.time() + 5
+        while reloader.status["generation"] == 0 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        reloader.stop()
+    assert reloader.status["generation"] == 1
+
+def test_reload_without_loaded_index_does_not_build(tmp_path, monkeypatch, use_faiss_index):
+    write_policy(tmp_path, [{"section": "1.1", "title": "Refunds", "text": "refund refund"}])
+    use_faiss_index(None)
+    builds = []
+    monkeypatch.setattr(retriever, "build_faiss_index", lambda *args, **kwargs: builds.append(kwargs))
+    reloader = PolicyReloader(policy_dir=str(tmp_path), interval=0)
+    assert reloader.reload() is False
+    assert builds == []
+    assert reloader.status["last_error"] is None
+
+def test_stale_mark_redoes_lazy_build(tmp_path, monkeypatch, keyword_encoder, use_faiss_index):
+    builds = []
+    def build(*args, **kwargs):
+        builds.append(len(builds))
+        if len(builds) == 1:
+            # Policy files change while the first lazy build is running
+            retriever.mark_faiss_index_stale()
+        return FAISSIndex(policy_dir=str(tmp_path), model=keyword_encoder)
+
+    write_policy(tmp_path, [{"section": "1.1", "title": "Refunds", "text": "refund refund"}])
+    use_faiss_index(None)
+    monkeypatch.setattr(retriever, "build_faiss_index", build)
+    assert retriever.get_faiss_index().get_index().ntotal == 1
+    assert builds == [0, 1]
+
+def test_reload_recovers_from_failed_index(tmp_path, monkeypatch, keyword_encoder, use_faiss_index):
+    # The API started with no policy files, so the cached build has no index and no model
+    use_faiss_index(FAISSIndex(policy_dir=str(tmp_path)))
+    monkeypatch.setattr(retriever, "build_faiss_index",
+                        lambda policy_dir=None, model=None: FAISSIndex(policy_dir=policy_dir, model=model or keyword_encoder))
+    reloader = PolicyReloader(policy_dir=str(tmp_path), interval=0)
+
+    assert reloader.reload() is False
+    assert "No policy sections" in reloader.status["last_error"]
+
+    write_policy(tmp_path, [{"section": "1.1", "title": "Refunds", "text": "refund refund"}])
+    assert reloader.reload() is True
+    assert reloader.status["generation"] == 1
+    assert reloader.status["last_error"] is None
+    assert retriever.retrieve_docs("refund please", top_k=1)[0]["section"] == "1.1"
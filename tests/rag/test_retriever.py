@@ -57,4 +57,65 @@ def test_retrieve_docs_distance_valid():
     ticket = "Sample query"
     results = retrieve_docs(ticket, top_k=2)
     for doc in results:
-        assert doc["distance"] >= 0.0
\ No newline at end of file
+        assert doc["distance"] >= 0.0
+
+def test_retrieve_docs_batch_structure():
+    from src.rag.retriever import retrieve_docs_batch
+    tickets = ["My domain was suspended", "", None, "Refund requested for my order"]
+    results = retrieve_docs_batch(tickets, top_k=2)
+
+    assert isinstance(results, list)
+    assert len(results) == len(tickets)
+    assert results[1] == []
+    assert results[2] == []
+    for docs in results:
+        assert len(docs) <= 2
+        assert all("policy" in doc and "distance" in doc for doc in docs)
+
+def test_retrieve_docs_batch_matches_single():
+    from src.rag.retriever import retrieve_docs_batch
+    ticket = "Reset password link expired"
+    batch_docs = retrieve_docs_batch([ticket], top_k=2)[0]
+    single_docs = retrieve_docs(ticket, top_k=2)
+    assert [d["section"] for d in batch_docs] == [d["section"] for d in single_docs]
+
+def test_set_faiss_index(tmp_path, keyword_encoder, use_faiss_index):
+    import json
+    from src.index.faiss_index import FAISSIndex
+
+    policy_data = {
+        "policy": "Swapped Policy",
+        "sections": [
+            {"section": "1.1", "title": "Refunds", "text": "refund refund"},
+            {"section": "1.2", "title": "Passwords", "text": "password password"}
+        ]
+    }
+    with open(tmp_path/"swapped.json", "w") as f:
+        json.dump(policy_data, f)
+
+    use_faiss_index(FAISSIndex(policy_dir=str(tmp_path), model=keyword_encoder))
+    results = retrieve_docs("password reset", top_k=1)
+    assert results[0]["policy"] == "Swapped Policy"
+    assert results[0]["section"] == "1.2"
+
+def test_warm_up_uninitialized_index(tmp_path, use_faiss_index):
+    from src.index.faiss_index import FAISSIndex
+    from src.rag import retriever
+
+    use_faiss_index(FAISSIndex(policy_dir=str(tmp_path)))
+    assert retriever.warm_up() is False
+
+def test_retrieve_docs_deduplicated_sources(tmp_path, keyword_encoder, use_faiss_index):
+    import json
+    from src.index.faiss_index import FAISSIndex
+
+    footer = "Contact our support team for further help with this policy."
+    for name, section in (("Refund Policy", "9.1"), ("Domain Policy", "7.3")):
+        policy_data = {"policy": name, "sections": [{"section": section, "title": "Support", "text": footer}]}
+        with open(tmp_path/f"{section}.json", "w") as f:
+            json.dump(policy_data, f)
+
+    use_faiss_index(FAISSIndex(policy_dir=str(tmp_path), model=keyword_encoder, dedup=True))
+    results = retrieve_docs("how do I reach support", top_k=2)
+    assert len(results) == 1
+    assert sorted(s["section"] for s in results[0]["sources"]) == ["7.3", "9.1"]
@@ -0,0 +1,92 @@
+# Unit tests for audit module
+
+import pytest
+import json
+import sqlite3
+import threading
+from unittest.mock import patch
+from src.audit import AuditLog, JSONLWriter, collect_audit_fields, note
+
+def test_note_outside_collection_is_ignored():
+    note(served_by="llm")
+    with collect_audit_fields() as fields:
+        note(served_by="llm", sections=[])
+    assert fields == {"served_by": "llm", "sections": []}
+
+def test_sqlite_backend_writes_in_wal_mode(tmp_path):
+    path = str(tmp_path / "audit.db")
+    audit_log = AuditLog(backend="sqlite", path=path)
+    for i in range(5):
+        assert audit_log.record({"request_id": str(i), "ticket": f"ticket {i}"})
+    assert audit_log.flush()
+    audit_log.stop()
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    rows = connection.execute("SELECT request_id, record FROM audit_log ORDER BY id").fetchall()
+    assert [row[0] for row in rows] == ["0", "1", "2", "3", "4"]
+    assert json.loads(rows[2][1])["ticket"] == "ticket 2"
+    assert audit_log.written == 5
+
+def test_stop_flushes_queued_records(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    audit_log = AuditLog(backend="jsonl", path=str(path), batch_size=3)
+    for i in range(10):
+        audit_log.record({"request_id": str(i)})
+    audit_log.stop()
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["request_id"] for line in lines] == [str(i) for i in range(10)]
+
+def test_jsonl_rotation(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    writer = JSONLWriter(str(path), max_bytes=200, backup_count=2)
+    for i in range(20):
+        writer.write([{"request_id": str(i), "padding": "x" * 50}])
+    writer.close()
+    assert (tmp_path / "audit.jsonl.1").exists()
+    assert (tmp_path / "audit.jsonl.2").exists()
+    assert not (tmp_path / "audit.jsonl.3").exists()
+
+class BlockedWriter:
+    def __init__(self):
+        self.release = threading.Event()
+        self.records = []
+
+    def write(self, records):
+        self.release.wait(5)
+        self.records.extend(records)
+
+    def close(self):
+        pass
+
+@pytest.mark.parametrize("overflow", ["drop", "block"])
+def test_full_queue_drops_records(overflow):
+    writer = BlockedWriter()
+    with patch("src.audit.open_writer", return_value=writer):
+        audit_log = AuditLog(max_queue=2, batch_size=1, overflow=overflow, block_timeout=0.01)
+        results = [audit_log.record({"request_id": str(i)}) for i in range(10)]
+        writer.release.set()
+        audit_log.stop()
+    assert results.count(False) == audit_log.dropped > 0
+    assert len(writer.records) == audit_log.written == 10 - audit_log.dropped
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        AuditLog(overflow="wait")
+
+def test_records_after_stop_are_dropped(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    audit_log = AuditLog(backend="jsonl", path=str(path))
+    assert audit_log.record({"request_id": "before"})
+    audit_log.stop()
+
+    assert audit_log.record({"request_id": "after"}) is False
+    assert audit_log._thread is None
+    assert audit_log.dropped == 1
+    assert [json.loads(line)["request_id"] for line in path.read_text().splitlines()] == ["before"]
+
+    # An explicit start() reopens the log, e.g. when the server starts again
+    audit_log.start()
+    assert audit_log.record({"request_id": "restarted"})
+    audit_log.stop()
+    assert json.loads(path.read_text().splitlines()[-1])["request_id"] == "restarted"
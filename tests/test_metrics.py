@@ -0,0 +1,72 @@
+# Unit tests for metrics module
+
+import pytest
+import time
+from unittest.mock import patch
+from src.metrics import Counter, Histogram, stage, collect_stage_timings, format_server_timing, render_metrics, STAGE_SECONDS
+
+def test_counter_render():
+    counter = Counter("test_events_total", "Test events.", ("kind",))
+    counter.inc(kind="a")
+    counter.inc(2, kind="b")
+    counter.inc(kind="a")
+    assert counter.value(kind="a") == 2
+    lines = counter.render()
+    assert "# TYPE test_events_total counter" in lines
+    assert 'test_events_total{kind="a"} 2' in lines
+    assert 'test_events_total{kind="b"} 2' in lines
+
+def test_unlabelled_counter_starts_at_zero():
+    counter = Counter("test_unlabelled_total", "Unlabelled.")
+    assert "test_unlabelled_total 0" in counter.render()
+
+def test_histogram_render_cumulative_buckets():
+    histogram = Histogram("test_latency_seconds", "Test latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="embed")
+    lines = histogram.render()
+    assert 'test_latency_seconds_bucket{stage="embed",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="embed",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="embed",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{stage="embed"} 4' in lines
+    assert 'test_latency_seconds_sum{stage="embed"} 6.05' in lines
+
+def test_label_values_escaped():
+    counter = Counter("test_escaped_total", "Escaping.", ("value",))
+    counter.inc(value='say "hi"\n')
+    assert 'test_escaped_total{value="say \\"hi\\"\\n"} 1' in counter.render()
+
+def test_metrics_disabled():
+    counter = Counter("test_disabled_total", "Disabled.")
+    with patch("src.config.METRICS_ENABLED", False):
+        counter.inc()
+    assert counter.value() == 0
+
+def test_stage_records_histogram_and_timings():
+    before = STAGE_SECONDS.count(stage="test_stage")
+    with collect_stage_timings() as timings:
+        with stage("test_stage"):
+            time.sleep(0.01)
+        with stage("test_stage"):
+            pass
+    assert STAGE_SECONDS.count(stage="test_stage") == before + 2
+    assert timings["test_stage"] >= 0.01
+
+def test_stage_outside_collection():
+    with stage("test_uncollected"):
+        pass
+    with collect_stage_timings() as timings:
+        pass
+    assert timings == {}
+
+def test_format_server_timing():
+    header = format_server_timing({"embed": 0.0123, "call_llm": 1.5})
+    assert header == "embed;dur=12.3, call_llm;dur=1500.0"
+
+def test_render_metrics_includes_pipeline_metrics():
+    page = render_metrics()
+    assert "# TYPE rag_stage_duration_seconds histogram" in page
+    assert "rag_llm_failures_total" in page
+    assert "rag_parse_failures_total" in page
+    assert "rag_empty_retrievals_total" in page
+    assert page.endswith("\n")